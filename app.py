@@ -1,8 +1,8 @@
 import streamlit as st
-import pandas as pd
-import io
 import os
-from parser import parse_statement
+import time
+from concurrent.futures import ThreadPoolExecutor
+from parser import parse_statement, STAGES
 from regex_patterns import REGEX_TEMPLATES
 from styles import get_custom_css
 
@@ -13,6 +13,175 @@ except ImportError:
     pass
 
 
+def render_result(results):
+    """Renders one parse result as a success banner and field table, or a failure alert."""
+    if results.get("status") == "SUCCESS":
+        bank_name = results.get('bank_name', 'N/A')
+        method = results.get('extraction_method', 'RegEx')
+        confidence = results.get('confidence')
+        confidence_note = f" | <strong>Confidence:</strong> {confidence:.0%}" if confidence is not None else ""
+        
+        # Success Banner
+        st.markdown(f"""
+        <div class="success-banner">
+            <h3>✅ Extraction Successful!</h3>
+            <p><strong>Bank:</strong> {bank_name} | <strong>Method:</strong> {method}{confidence_note}</p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # Get extracted data
+        card_digits = results.get('card_last_4_digits', 'N/A')
+        statement_date = results.get('statement_date', 'N/A')
+        due_date = results.get('payment_due_date', 'N/A')
+        total_due = results.get('total_due', 'N/A')
+        min_payment = results.get('min_payment', 'N/A')
+        
+        # Detailed Table Section
+        st.markdown("### 📋 Detailed Information")
+        
+        # Create HTML table with Catppuccin colors
+        table_html = f"""
+        <table style="width: 100%; border-collapse: separate; border-spacing: 0; margin: 1.5rem 0; border-radius: 12px; overflow: hidden; box-shadow: 0 4px 15px rgba(0,0,0,0.4);">
+            <thead>
+                <tr style="background: linear-gradient(135deg, #cba6f7 0%, #89b4fa 100%);">
+                    <th style="color: #11111b; padding: 1rem; text-align: left; font-weight: 600; font-size: 1rem; width: 35%;">Field</th>
+                    <th style="color: #11111b; padding: 1rem; text-align: left; font-weight: 600; font-size: 1rem;">Extracted Value</th>
+                </tr>
+            </thead>
+            <tbody>
+                <tr style="background: {'#313244' if bank_name != 'N/A' else '#45475a'};">
+                    <td style="padding: 0.9rem 1rem; border-bottom: 1px solid #45475a; color: {'#a6e3a1' if bank_name != 'N/A' else '#f38ba8'}; font-weight: 500;">🏦 Bank Name</td>
+                    <td style="padding: 0.9rem 1rem; border-bottom: 1px solid #45475a; color: {'#cdd6f4' if bank_name != 'N/A' else '#f38ba8'}; font-weight: 600;">{bank_name}</td>
+                </tr>
+                <tr style="background: {'#313244' if card_digits != 'NOT_FOUND' else '#45475a'};">
+                    <td style="padding: 0.9rem 1rem; border-bottom: 1px solid #45475a; color: {'#a6e3a1' if card_digits != 'NOT_FOUND' else '#f38ba8'}; font-weight: 500;">💳 Card Last 4 Digits</td>
+                    <td style="padding: 0.9rem 1rem; border-bottom: 1px solid #45475a; color: {'#cdd6f4' if card_digits != 'NOT_FOUND' else '#f38ba8'}; font-weight: 600;">{'❌ NOT FOUND' if card_digits == 'NOT_FOUND' else card_digits}</td>
+                </tr>
+                <tr style="background: {'#313244' if statement_date != 'NOT_FOUND' else '#45475a'};">
+                    <td style="padding: 0.9rem 1rem; border-bottom: 1px solid #45475a; color: {'#a6e3a1' if statement_date != 'NOT_FOUND' else '#f38ba8'}; font-weight: 500;">📅 Statement Date</td>
+                    <td style="padding: 0.9rem 1rem; border-bottom: 1px solid #45475a; color: {'#cdd6f4' if statement_date != 'NOT_FOUND' else '#f38ba8'}; font-weight: 600;">{'❌ NOT FOUND' if statement_date == 'NOT_FOUND' else statement_date}</td>
+                </tr>
+                <tr style="background: {'#313244' if due_date != 'NOT_FOUND' else '#45475a'};">
+                    <td style="padding: 0.9rem 1rem; border-bottom: 1px solid #45475a; color: {'#a6e3a1' if due_date != 'NOT_FOUND' else '#f38ba8'}; font-weight: 500;">⏰ Payment Due Date</td>
+                    <td style="padding: 0.9rem 1rem; border-bottom: 1px solid #45475a; color: {'#cdd6f4' if due_date != 'NOT_FOUND' else '#f38ba8'}; font-weight: 600;">{'❌ NOT FOUND' if due_date == 'NOT_FOUND' else due_date}</td>
+                </tr>
+                <tr style="background: {'#313244' if total_due != 'NOT_FOUND' else '#45475a'};">
+                    <td style="padding: 0.9rem 1rem; border-bottom: 1px solid #45475a; color: {'#a6e3a1' if total_due != 'NOT_FOUND' else '#f38ba8'}; font-weight: 500;">💰 Total Amount Due</td>
+                    <td style="padding: 0.9rem 1rem; border-bottom: 1px solid #45475a; color: {'#cdd6f4' if total_due != 'NOT_FOUND' else '#f38ba8'}; font-weight: 600;">{'❌ NOT FOUND' if total_due == 'NOT_FOUND' else f'₹ {total_due}'}</td>
+                </tr>
+                <tr style="background: {'#313244' if min_payment != 'NOT_FOUND' else '#45475a'};">
+                    <td style="padding: 0.9rem 1rem; color: {'#a6e3a1' if min_payment != 'NOT_FOUND' else '#f38ba8'}; font-weight: 500;">💵 Minimum Payment</td>
+                    <td style="padding: 0.9rem 1rem; color: {'#cdd6f4' if min_payment != 'NOT_FOUND' else '#f38ba8'}; font-weight: 600;">{'❌ NOT FOUND' if min_payment == 'NOT_FOUND' else f'₹ {min_payment}'}</td>
+                </tr>
+            </tbody>
+        </table>
+        """
+        
+        st.markdown(table_html, unsafe_allow_html=True)
+        
+        # LLM Status Info
+        llm_status = results.get("llm_status", "N/A")
+        
+        if llm_status == "SUCCESS":
+            st.success("🤖 AI successfully filled missing fields!")
+        elif llm_status == "FAILED":
+            st.warning(f"⚠️ LLM Fallback Error: {results.get('llm_error', 'Failed to get data.')}")
+        elif llm_status == "SKIPPED":
+            st.info("ℹ️ LLM fallback was not needed - RegEx extraction was successful!")
+    
+    else:
+        st.markdown(f"""
+        <div class="alert-box alert-warning">
+            <span>❌</span>
+            <span><strong>Extraction Failed:</strong> {results.get('reason', 'Unknown error')}</span>
+        </div>
+        """, unsafe_allow_html=True)
+
+
+PARSE_WORKERS = 4
+
+STAGE_LABELS = {
+    "queued": "⏳ Queued",
+    "text_extraction": "📄 Extracting text",
+    "bank_identification": "🏦 Identifying bank",
+    "regex": "🔍 Running RegEx patterns",
+    "llm_fallback": "🤖 Asking Gemini for missing fields",
+}
+
+
+@st.cache_resource
+def get_executor():
+    """Background pool shared by all sessions, so parsing survives Streamlit reruns."""
+    return ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix="parse")
+
+
+def upload_key(uploaded_file):
+    """Stable identity of an upload across reruns."""
+    return getattr(uploaded_file, "file_id", None) or f"{uploaded_file.name}:{uploaded_file.size}"
+
+
+def parse_uploads(uploaded_files, api_key):
+    """
+    Parses uploads concurrently in the background executor and renders each result as soon as it finishes.
+    Finished results and running jobs live in session state, so reruns never re-parse a file.
+    """
+    results = st.session_state.setdefault("results", {})
+    jobs = st.session_state.setdefault("jobs", {})
+    executor = get_executor()
+
+    current_keys = {upload_key(f) for f in uploaded_files}
+    for file_key in [k for k in results if k not in current_keys]:
+        del results[file_key]
+
+    slots = []
+    for uploaded_file in uploaded_files:
+        file_key = upload_key(uploaded_file)
+        if file_key not in results and file_key not in jobs:
+            # Worker threads must not call Streamlit, so they only update this dict
+            progress = {"stage": "queued"}
+            future = executor.submit(
+                parse_statement,
+                # A view of the upload's own buffer, so the file is not held twice
+                uploaded_file.getbuffer(),
+                api_key=api_key,
+                # The UI never shows the extracted text
+                keep_raw_text=False,
+                on_stage=lambda stage, progress=progress: progress.update(stage=stage),
+            )
+            jobs[file_key] = (future, progress)
+        slots.append((uploaded_file, file_key, st.empty()))
+
+    while slots:
+        pending = []
+        for uploaded_file, file_key, slot in slots:
+            job = jobs.get(file_key)
+            if job and job[0].done():
+                del jobs[file_key]
+                try:
+                    results[file_key] = job[0].result()
+                except Exception as e:
+                    results[file_key] = {"status": "FAILED", "reason": f"Unexpected error: {e}"}
+
+            with slot.container():
+                st.markdown(f"""
+                <div class="alert-box alert-info">
+                    <span>📄</span>
+                    <span><strong>File uploaded:</strong> {uploaded_file.name} ({uploaded_file.size / 1024:.1f} KB)</span>
+                </div>
+                """, unsafe_allow_html=True)
+                if file_key in results:
+                    render_result(results[file_key])
+                else:
+                    stage = job[1]["stage"] if job else "queued"
+                    step = (["queued"] + STAGES).index(stage) if stage in STAGES else 0
+                    st.progress(step / (len(STAGES) + 1), text=STAGE_LABELS.get(stage, stage))
+                    pending.append((uploaded_file, file_key, slot))
+        slots = pending
+        if slots:
+            time.sleep(0.25)
+
+
+
 def main():
     """Main application with Catppuccin Mocha theme"""
     
@@ -99,107 +268,17 @@ def main():
     st.markdown('<p class="section-header">📤 Upload Your Statement</p>', unsafe_allow_html=True)
     
     # File uploader - now fully clickable
-    uploaded_file = st.file_uploader(
-        "Drag and Drop Your PDF Here",
+    uploaded_files = st.file_uploader(
+        "Drag and Drop Your PDFs Here",
         type="pdf",
-        help="Upload a credit card statement PDF from supported banks"
+        accept_multiple_files=True,
+        help="Upload one or more credit card statement PDFs from supported banks"
     )
     
-    if uploaded_file:
-        st.markdown(f"""
-        <div class="alert-box alert-info">
-            <span>📄</span>
-            <span><strong>File uploaded:</strong> {uploaded_file.name} ({uploaded_file.size / 1024:.1f} KB)</span>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        bytes_data = io.BytesIO(uploaded_file.getvalue())
-        
-        with st.spinner('🔄 Analyzing PDF and extracting data...'):
-            results = parse_statement(bytes_data, api_key=gemini_api_key)
-        
+    if uploaded_files:
         # Display Results
         st.markdown('<p class="section-header">📊 Extraction Results</p>', unsafe_allow_html=True)
-        
-        if results.get("status") == "SUCCESS":
-            bank_name = results.get('bank_name', 'N/A')
-            method = results.get('extraction_method', 'RegEx')
-            
-            # Success Banner
-            st.markdown(f"""
-            <div class="success-banner">
-                <h3>✅ Extraction Successful!</h3>
-                <p><strong>Bank:</strong> {bank_name} | <strong>Method:</strong> {method}</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Get extracted data
-            card_digits = results.get('card_last_4_digits', 'N/A')
-            statement_date = results.get('statement_date', 'N/A')
-            due_date = results.get('payment_due_date', 'N/A')
-            total_due = results.get('total_due', 'N/A')
-            min_payment = results.get('min_payment', 'N/A')
-            
-            # Detailed Table Section
-            st.markdown("### 📋 Detailed Information")
-            
-            # Create HTML table with Catppuccin colors
-            table_html = f"""
-            <table style="width: 100%; border-collapse: separate; border-spacing: 0; margin: 1.5rem 0; border-radius: 12px; overflow: hidden; box-shadow: 0 4px 15px rgba(0,0,0,0.4);">
-                <thead>
-                    <tr style="background: linear-gradient(135deg, #cba6f7 0%, #89b4fa 100%);">
-                        <th style="color: #11111b; padding: 1rem; text-align: left; font-weight: 600; font-size: 1rem; width: 35%;">Field</th>
-                        <th style="color: #11111b; padding: 1rem; text-align: left; font-weight: 600; font-size: 1rem;">Extracted Value</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    <tr style="background: {'#313244' if bank_name != 'N/A' else '#45475a'};">
-                        <td style="padding: 0.9rem 1rem; border-bottom: 1px solid #45475a; color: {'#a6e3a1' if bank_name != 'N/A' else '#f38ba8'}; font-weight: 500;">🏦 Bank Name</td>
-                        <td style="padding: 0.9rem 1rem; border-bottom: 1px solid #45475a; color: {'#cdd6f4' if bank_name != 'N/A' else '#f38ba8'}; font-weight: 600;">{bank_name}</td>
-                    </tr>
-                    <tr style="background: {'#313244' if card_digits != 'NOT_FOUND' else '#45475a'};">
-                        <td style="padding: 0.9rem 1rem; border-bottom: 1px solid #45475a; color: {'#a6e3a1' if card_digits != 'NOT_FOUND' else '#f38ba8'}; font-weight: 500;">💳 Card Last 4 Digits</td>
-                        <td style="padding: 0.9rem 1rem; border-bottom: 1px solid #45475a; color: {'#cdd6f4' if card_digits != 'NOT_FOUND' else '#f38ba8'}; font-weight: 600;">{'❌ NOT FOUND' if card_digits == 'NOT_FOUND' else card_digits}</td>
-                    </tr>
-                    <tr style="background: {'#313244' if statement_date != 'NOT_FOUND' else '#45475a'};">
-                        <td style="padding: 0.9rem 1rem; border-bottom: 1px solid #45475a; color: {'#a6e3a1' if statement_date != 'NOT_FOUND' else '#f38ba8'}; font-weight: 500;">📅 Statement Date</td>
-                        <td style="padding: 0.9rem 1rem; border-bottom: 1px solid #45475a; color: {'#cdd6f4' if statement_date != 'NOT_FOUND' else '#f38ba8'}; font-weight: 600;">{'❌ NOT FOUND' if statement_date == 'NOT_FOUND' else statement_date}</td>
-                    </tr>
-                    <tr style="background: {'#313244' if due_date != 'NOT_FOUND' else '#45475a'};">
-                        <td style="padding: 0.9rem 1rem; border-bottom: 1px solid #45475a; color: {'#a6e3a1' if due_date != 'NOT_FOUND' else '#f38ba8'}; font-weight: 500;">⏰ Payment Due Date</td>
-                        <td style="padding: 0.9rem 1rem; border-bottom: 1px solid #45475a; color: {'#cdd6f4' if due_date != 'NOT_FOUND' else '#f38ba8'}; font-weight: 600;">{'❌ NOT FOUND' if due_date == 'NOT_FOUND' else due_date}</td>
-                    </tr>
-                    <tr style="background: {'#313244' if total_due != 'NOT_FOUND' else '#45475a'};">
-                        <td style="padding: 0.9rem 1rem; border-bottom: 1px solid #45475a; color: {'#a6e3a1' if total_due != 'NOT_FOUND' else '#f38ba8'}; font-weight: 500;">💰 Total Amount Due</td>
-                        <td style="padding: 0.9rem 1rem; border-bottom: 1px solid #45475a; color: {'#cdd6f4' if total_due != 'NOT_FOUND' else '#f38ba8'}; font-weight: 600;">{'❌ NOT FOUND' if total_due == 'NOT_FOUND' else f'₹ {total_due}'}</td>
-                    </tr>
-                    <tr style="background: {'#313244' if min_payment != 'NOT_FOUND' else '#45475a'};">
-                        <td style="padding: 0.9rem 1rem; color: {'#a6e3a1' if min_payment != 'NOT_FOUND' else '#f38ba8'}; font-weight: 500;">💵 Minimum Payment</td>
-                        <td style="padding: 0.9rem 1rem; color: {'#cdd6f4' if min_payment != 'NOT_FOUND' else '#f38ba8'}; font-weight: 600;">{'❌ NOT FOUND' if min_payment == 'NOT_FOUND' else f'₹ {min_payment}'}</td>
-                    </tr>
-                </tbody>
-            </table>
-            """
-            
-            st.markdown(table_html, unsafe_allow_html=True)
-            
-            # LLM Status Info
-            llm_status = results.get("llm_status", "N/A")
-            
-            if llm_status == "SUCCESS":
-                st.success("🤖 AI successfully filled missing fields!")
-            elif llm_status == "FAILED":
-                st.warning(f"⚠️ LLM Fallback Error: {results.get('llm_error', 'Failed to get data.')}")
-            elif llm_status == "SKIPPED":
-                st.info("ℹ️ LLM fallback was not needed - RegEx extraction was successful!")
-        
-        else:
-            st.markdown(f"""
-            <div class="alert-box alert-warning">
-                <span>❌</span>
-                <span><strong>Extraction Failed:</strong> {results.get('reason', 'Unknown error')}</span>
-            </div>
-            """, unsafe_allow_html=True)
+        parse_uploads(uploaded_files, gemini_api_key)
     
     # Footer
     st.markdown("""
@@ -0,0 +1,369 @@
+import argparse
+import csv
+import glob
+import importlib
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, Dict, Any, List, Iterable, Iterator, Set
+
+import normalize
+import parser
+import pdf_backends
+import pattern_profiler
+import pattern_registry
+from parser import parse_statement, bank_key_for, KEYS_TO_SEARCH
+from result_cache import ResultCache
+
+if TYPE_CHECKING:
+    from llm_batch import LLMBatcher
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+CSV_FIELDS = ["file", "status", "bank_name"] + KEYS_TO_SEARCH + ["confidence", "extraction_method", "llm_status", "llm_error", "reason"]
+
+# Per-worker result cache, set up by init_worker
+_cache = None
+
+
+def init_worker(cache_db: str = None, profile: bool = False, memory_limit_mb: float = None,
+                preload_llm: bool = False) -> None:
+    """
+    Worker initializer: imports the PDF libraries (and requests, with preload_llm), compiles all
+    templates, opens the shared result cache, enables profiling and sets the streaming memory ceiling.
+    """
+    global _cache
+    pdf_backends.preload()
+    if preload_llm:
+        importlib.import_module("requests")
+    pattern_registry.warmup()
+    if memory_limit_mb:
+        parser.MEMORY_LIMIT_MB = memory_limit_mb
+    if cache_db:
+        _cache = ResultCache(db_path=cache_db)
+    if profile:
+        pattern_profiler.enable()
+
+
+def collect_inputs(inputs: Iterable[str]) -> List[str]:
+    """Expands directories, glob patterns and file names into a sorted, de-duplicated list of PDFs."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                paths.extend(os.path.join(root, f) for f in files if f.lower().endswith(".pdf"))
+        elif glob.has_magic(item):
+            paths.extend(glob.glob(item, recursive=True))
+        else:
+            paths.append(item)
+    return sorted(set(paths))
+
+
+def parse_file(path: str, api_key: str = None, incremental: bool = False, streaming: bool = False,
+               with_transactions: bool = False, typed: bool = False, defer_llm: bool = False) -> Dict[str, Any]:
+    """
+    Parses one PDF file into an output record; errors become records instead of exceptions.
+    With with_transactions, the record also carries the statement's transaction DataFrame.
+    With typed, amounts are whole paise and dates ISO strings (see normalize.normalize_fields).
+    With defer_llm, a record that needs the LLM fallback comes back PENDING with its llm_request,
+    and is typed once run_batch has its answer.
+    """
+    try:
+        # The path is memory-mapped rather than read into memory
+        result = parse_statement(path, api_key=api_key, incremental=incremental, cache=_cache, streaming=streaming,
+                                 keep_raw_text=False, defer_llm=defer_llm)
+        table = None
+        if with_transactions and result.get("status") == "SUCCESS":
+            # pandas is only imported by runs that ask for transactions
+            import transactions
+            table = transactions.extract_transactions(path, bank_key_for(result))
+            table.insert(0, "file", path)
+    except Exception as e:
+        return {"file": path, "status": "ERROR", "reason": f"{type(e).__name__}: {e}"}
+    if typed and result.get("status") == "SUCCESS" and result.get("llm_status") != "PENDING":
+        result = normalize.normalize_fields(result, bank_key_for(result))
+    record = {"file": path}
+    record.update(result.items())
+    if table is not None:
+        # Travels back to run_batch's caller, which writes it to the Parquet output
+        record["_transactions"] = table
+    if pattern_profiler.active:
+        # Counters travel back with the record; run_batch folds them into the parent's profiler
+        record["_profile"] = pattern_profiler.active.drain()
+    return record
+
+
+def run_batch(paths: List[str], jobs: int = None, ordered: bool = True, api_key: str = None,
+              incremental: bool = False, cache_db: str = None, streaming: bool = False,
+              memory_limit_mb: float = None, with_transactions: bool = False,
+              typed: bool = False, llm_batcher: "LLMBatcher" = None) -> Iterator[Dict[str, Any]]:
+    """
+    Fans the files out across a process pool and yields records as documents finish.
+    Ordered mode yields in input order; unordered mode yields in completion order.
+    At most a few tasks per worker are in flight, so huge inputs do not pile up in memory.
+    When profiling is active in this process, workers profile too and their counters are merged here.
+    With with_transactions, each successful record carries its transactions under "_transactions".
+    With typed, records hold paise amounts and ISO dates.
+    With an llm_batcher, workers defer the LLM fallback and the records that need it are answered
+    here in batches (see llm_batch.LLMBatcher), then yielded.
+    """
+    profiler = pattern_profiler.active
+    jobs = jobs or os.cpu_count() or 1
+    max_in_flight = jobs * 4
+    pending = iter(paths)
+    # Records yet to be yielded: waiting for their LLM answer or a retry, or (ordered mode) behind one that is
+    held = []
+    awaiting = {}
+    # Placeholder records of files whose worker died, by id; each is retried once (see run_batch's loop)
+    retrying = {}
+    retry = deque()
+    # Records finished here are cached here; the workers only see them PENDING
+    cache = ResultCache(db_path=cache_db) if cache_db and llm_batcher else None
+
+    def complete(answers):
+        for key, llm_results in answers:
+            record = awaiting.pop(key)
+            cache_keys = record["llm_request"].get("cache_keys", [])
+            parser.complete_llm_request(record, llm_results)
+            # Cached as the worker would have, before typing and without this run's extras
+            if cache is not None and record.get("llm_status") != "FAILED":
+                result = {k: v for k, v in record.items() if k not in ("file", "raw_text", "_transactions")}
+                for cache_key in cache_keys:
+                    cache.put(cache_key, result)
+            if typed and record.get("status") == "SUCCESS":
+                record.update(normalize.normalize_fields(record, bank_key_for(record)))
+
+    def blocked(record) -> bool:
+        return id(record) in awaiting or id(record) in retrying
+
+    def releasable():
+        if ordered:
+            count = next((i for i, record in enumerate(held) if blocked(record)), len(held))
+        else:
+            count = len(held)
+        ready = [record for record in held[:count] if not blocked(record)]
+        held[:count] = [record for record in held[:count] if blocked(record)]
+        return ready
+
+    # Workers call the LLM themselves unless the batcher answers for them
+    calls_llm = bool(api_key and api_key != "GEMINI_API_KEY") and llm_batcher is None
+
+    def new_executor() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                                   initargs=(cache_db, profiler is not None, memory_limit_mb, calls_llm))
+
+    executor = new_executor()
+    try:
+        in_flight = deque()
+        # Each task's path, the pool it runs in and, for a retry, its placeholder record
+        submitted = {}
+
+        def fill():
+            nonlocal executor
+            while len(in_flight) < max_in_flight:
+                # A retry runs alone, once the files in flight have finished, so a file that kills its
+                # worker again takes no other file with it and a pool another file broke is not held against it
+                if any(submitted[f][2] is not None for f in in_flight):
+                    return
+                if retry:
+                    if in_flight:
+                        return
+                    path, placeholder = retry.popleft()
+                else:
+                    path, placeholder = next(pending, None), None
+                    if path is None:
+                        return
+                args = (parse_file, path, api_key, incremental, streaming, with_transactions, typed,
+                        llm_batcher is not None)
+                try:
+                    future = executor.submit(*args)
+                except BrokenProcessPool:
+                    executor = new_executor()
+                    future = executor.submit(*args)
+                submitted[future] = (path, executor, placeholder)
+                in_flight.append(future)
+
+        fill()
+        while in_flight or held:
+            if in_flight:
+                # Wakes for a finished document, a finished LLM batch, or a queued batch falling due
+                watched = [in_flight[0]] if ordered else list(in_flight)
+                timeout = llm_batcher.seconds_until_due() if llm_batcher else None
+                finished, _ = wait(watched + (llm_batcher.in_flight if llm_batcher else []), timeout=timeout,
+                                   return_when=FIRST_COMPLETED)
+                done = [f for f in watched if f in finished]
+                for future in done:
+                    in_flight.remove(future)
+            else:
+                done = []
+            for future in done:
+                path, pool, placeholder = submitted.pop(future)
+                try:
+                    record = future.result()
+                except BrokenProcessPool:
+                    # A worker died (killed for memory, or a crash in the PDF library) and every task in its
+                    # pool failed with it. The rest of the run gets a fresh pool; each of those files is
+                    # retried once, and one that fails again is recorded as an error
+                    if pool is executor:
+                        executor.shutdown(wait=False)
+                        executor = new_executor()
+                    if placeholder is None:
+                        placeholder = {"file": path}
+                        retrying[id(placeholder)] = placeholder
+                        retry.append((path, placeholder))
+                        held.append(placeholder)
+                        continue
+                    record = {"file": path, "status": "ERROR", "reason": "Worker process died while parsing."}
+                if placeholder is not None:
+                    # Fills the placeholder in place, keeping its position in held
+                    del retrying[id(placeholder)]
+                    placeholder.update(record)
+                    record = placeholder
+                profile = record.pop("_profile", None)
+                if profile and profiler:
+                    profiler.merge(profile)
+                if "llm_request" in record:
+                    awaiting[id(record)] = record
+                    llm_batcher.add(id(record), record["llm_request"])
+                if placeholder is None:
+                    held.append(record)
+            if llm_batcher:
+                complete(llm_batcher.poll(block=not in_flight))
+            yield from releasable()
+            fill()
+    finally:
+        executor.shutdown()
+
+
+def truncate_partial_record(output_path: str, fmt: str) -> None:
+    """
+    Cuts the unfinished last record of an interrupted run off a partial output file, so a resumed
+    run neither counts it as done nor appends onto it. A CSV record ends at a newline outside quotes.
+    """
+    if not os.path.exists(output_path):
+        return
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n")
+        if fmt == "csv":
+            # Quotes inside a field are doubled, so an odd count means the newline is inside a field
+            while end >= 0 and data.count(b'"', 0, end) % 2:
+                end = data.rfind(b"\n", 0, end)
+        if end + 1 < len(data):
+            f.truncate(end + 1)
+
+
+def read_done_files(output_path: str, fmt: str) -> Set[str]:
+    """Returns the files already recorded in a partial output file."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            done.update(row["file"] for row in csv.DictReader(f) if row.get("file"))
+        else:
+            for line in f:
+                try:
+                    done.add(json.loads(line)["file"])
+                except (ValueError, KeyError):
+                    # A truncated last line from an interrupted run is reprocessed
+                    continue
+    return done
+
+
+def main(argv: List[str] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Parse many credit card statements in parallel.")
+    arg_parser.add_argument("inputs", nargs="+", help="PDF files, directories or glob patterns")
+    arg_parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    arg_parser.add_argument("-f", "--format", choices=["jsonl", "csv"], default="jsonl")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    arg_parser.add_argument("--unordered", action="store_true", help="Write records as soon as they finish")
+    arg_parser.add_argument("--resume", action="store_true", help="Skip files already present in the output file")
+    arg_parser.add_argument("--incremental", action="store_true", help="Stop reading pages once all fields are found")
+    arg_parser.add_argument("--streaming", action="store_true",
+                            help="Keep only a rolling window of text per document (for very long statements)")
+    arg_parser.add_argument("--memory-limit", type=float, metavar="MB",
+                            help="Fail a streamed document once its worker uses more than this much memory")
+    arg_parser.add_argument("--typed", action="store_true",
+                            help="Write amounts as whole paise and dates as YYYY-MM-DD (unreadable values become null)")
+    arg_parser.add_argument("--transactions", metavar="PATH",
+                            help="Also extract every statement's transactions into one Parquet file (rewritten each run)")
+    arg_parser.add_argument("--cache-db", help="SQLite result cache shared by all workers")
+    arg_parser.add_argument("--llm-batch", type=int, nargs="?", const=20, metavar="DOCS",
+                            help="Send the LLM fallback for up to DOCS statements per Gemini request (default 20)")
+    arg_parser.add_argument("--llm-batch-wait", type=float, default=2.0, metavar="SECONDS",
+                            help="Send a partial LLM batch once its oldest statement has waited this long")
+    arg_parser.add_argument("--profile", metavar="PATH", help="Write per-pattern hit-rate and timing counters as JSON")
+    args = arg_parser.parse_args(argv)
+    if args.resume and args.transactions:
+        # The Parquet file is rewritten each run and only readable once closed, so the transactions
+        # of files a resumed run skips would be lost
+        arg_parser.error("--resume cannot be combined with --transactions; rerun the whole batch instead")
+
+    paths = collect_inputs(args.inputs)
+    if args.resume and args.output:
+        truncate_partial_record(args.output, args.format)
+        done = read_done_files(args.output, args.format)
+        paths = [p for p in paths if p not in done]
+
+    api_key = os.environ.get("GEMINI_API_KEY")
+    if args.profile:
+        pattern_profiler.enable()
+    appending = args.resume and args.output and os.path.exists(args.output) and os.path.getsize(args.output) > 0
+    out = open(args.output, "a" if appending else "w", newline="", encoding="utf-8") if args.output else sys.stdout
+
+    llm_batcher = None
+    if args.llm_batch and api_key and api_key != "GEMINI_API_KEY":
+        from llm_batch import LLMBatcher
+        llm_batcher = LLMBatcher(api_key, max_documents=args.llm_batch, max_wait=args.llm_batch_wait)
+
+    transactions_writer = None
+    try:
+        writer = None
+        if args.format == "csv":
+            writer = csv.DictWriter(out, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            if not appending:
+                writer.writeheader()
+
+        failed = 0
+        for record in run_batch(paths, args.jobs, not args.unordered, api_key, args.incremental, args.cache_db,
+                                args.streaming, args.memory_limit, bool(args.transactions),
+                                args.typed, llm_batcher):
+            if record.get("status") != "SUCCESS":
+                failed += 1
+            table = record.pop("_transactions", None)
+            if table is not None:
+                if transactions_writer is None:
+                    from transactions import ParquetAppender
+                    transactions_writer = ParquetAppender(args.transactions)
+                transactions_writer.write(table)
+            if writer:
+                writer.writerow(record)
+            else:
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if transactions_writer:
+            transactions_writer.close()
+        if llm_batcher:
+            llm_batcher.close()
+            print(f"LLM fallback: {llm_batcher.documents} statement(s) in {llm_batcher.requests} request(s).",
+                  file=sys.stderr)
+
+    if args.profile:
+        pattern_profiler.active.dump(args.profile)
+    print(f"Processed {len(paths)} file(s), {failed} not successful.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
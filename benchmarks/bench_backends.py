@@ -0,0 +1,96 @@
+"""
+Speed and accuracy of each PDF text backend, per bank.
+
+Parses every statement with each backend in pdf_backends.BACKENDS and reports, per bank,
+the mean parse_statement time, field accuracy against the expected values and how many
+documents give exactly the same fields as pdfplumber. A bank whose statements all match
+can declare the faster backend in its template ("backend": "textstream").
+
+Runs on synthetic statements by default, drawn in reading order and bottom-up. Point --dir
+at a folder of real statements with an expected.json in the format synthetic.py --out writes.
+
+    python benchmarks/bench_backends.py --count 5 --pages 10
+    python benchmarks/bench_backends.py --dir fixtures
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parser
+import pdf_backends
+from synthetic import generate_corpus
+
+
+def load_dir(path: str) -> List[Dict]:
+    """Statements from a fixture directory: PDFs plus expected.json mapping file name to fields and bank."""
+    with open(os.path.join(path, "expected.json"), encoding="utf-8") as f:
+        expected = json.load(f)
+    corpus = []
+    for name, fields in sorted(expected.items()):
+        with open(os.path.join(path, name), "rb") as f:
+            pdf = f.read()
+        fields = dict(fields)
+        corpus.append({"bank": fields.pop("bank"), "name": name, "pdf": pdf, "expected": fields})
+    return corpus
+
+
+def parse_fields(pdf: bytes, backend: str) -> tuple:
+    parser.PDF_BACKEND = backend
+    started = time.perf_counter()
+    result = parser.parse_statement(io.BytesIO(pdf))
+    elapsed = time.perf_counter() - started
+    return elapsed, {key: result.get(key) for key in parser.KEYS_TO_SEARCH}
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--dir", help="Fixture directory with PDFs and expected.json")
+    arg_parser.add_argument("--count", type=int, default=3, help="Synthetic statements per bank and draw order")
+    arg_parser.add_argument("--pages", type=int, default=5)
+    arg_parser.add_argument("--transactions", type=int, default=40, help="Transactions per page")
+    args = arg_parser.parse_args(argv)
+
+    if args.dir:
+        corpus = load_dir(args.dir)
+    else:
+        corpus = []
+        for draw_order in ("reading", "reverse"):
+            for doc in generate_corpus(None, args.count, args.pages, args.transactions, draw_order):
+                doc["bank"] = f"{doc['bank']} ({draw_order})"
+                corpus.append(doc)
+
+    rows: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for doc in corpus:
+        reference = None
+        for backend in pdf_backends.BACKENDS:
+            elapsed, fields = parse_fields(doc["pdf"], backend)
+            if reference is None:
+                reference = fields
+            stats = rows.setdefault(doc["bank"], {}).setdefault(backend, {"docs": 0, "seconds": 0.0, "correct": 0,
+                                                                          "fields": 0, "identical": 0})
+            stats["docs"] += 1
+            stats["seconds"] += elapsed
+            stats["fields"] += len(doc["expected"])
+            stats["correct"] += sum(fields.get(key) == value for key, value in doc["expected"].items())
+            stats["identical"] += fields == reference
+    parser.PDF_BACKEND = None
+
+    print(f"{'bank':<20} {'backend':<11} {'docs':>5} {'ms/doc':>9} {'speedup':>8} {'accuracy':>9} {'same as ref':>12}")
+    for bank, backends in rows.items():
+        reference_ms = None
+        for backend, stats in backends.items():
+            ms = stats["seconds"] / stats["docs"] * 1000
+            reference_ms = reference_ms or ms
+            print(f"{bank:<20} {backend:<11} {stats['docs']:>5} {ms:>9.1f} {reference_ms / ms:>7.1f}x "
+                  f"{stats['correct'] / stats['fields']:>9.1%} {stats['identical']:>6}/{stats['docs']:<5}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
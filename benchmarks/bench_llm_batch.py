@@ -0,0 +1,112 @@
+"""
+Per-document versus batched LLM fallback in batch mode, against a simulated Gemini endpoint.
+
+Writes synthetic statements whose minimum-due label no pattern knows, so every one needs the
+fallback, then runs batch.run_batch twice: with each worker calling extract_with_llm, and with an
+llm_batch.LLMBatcher packing the requests into shared calls. The simulated endpoint answers from
+the excerpts it is sent and takes --latency seconds per request plus --per-document seconds per
+statement in it. Reports requests sent, wall time and how many answers landed on the right statement.
+
+    python benchmarks/bench_llm_batch.py --count 20 --jobs 4 --batch 20
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from typing import Any, Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch
+import parser
+from llm_batch import LLMBatcher
+from synthetic import generate_statement, write_pdf
+
+# No template pattern or LLM context label matches this, so min_payment is always left to the fallback
+HIDDEN_LABEL = "Least Payable"
+HIDDEN_VALUE_RE = re.compile(HIDDEN_LABEL + r"\D*([\d,]+\.\d{2})")
+DOCUMENT_RE = re.compile(r"=== document_id: (\S+) \| fields: [^=]*===\n(.*?)(?=\n=== document_id|\Z)", re.DOTALL)
+
+
+class SimulatedGemini:
+    """Stands in for GeminiClient: reads min_payment from each excerpt after a simulated delay."""
+
+    def __init__(self, latency: float, per_document: float):
+        self.latency = latency
+        self.per_document = per_document
+
+    def post_json(self, url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        query = payload["contents"][0]["parts"][0]["text"]
+        documents = DOCUMENT_RE.findall(query)
+        time.sleep(self.latency + self.per_document * max(1, len(documents)))
+
+        def answer(text: str) -> Dict[str, str]:
+            match = HIDDEN_VALUE_RE.search(text)
+            return {"min_payment": match.group(1) if match else "NOT_FOUND"}
+
+        if documents:
+            body = [dict(answer(text), document_id=document_id) for document_id, text in documents]
+        else:
+            body = answer(query)
+        return {"candidates": [{"content": {"parts": [{"text": json.dumps(body)}]}}]}
+
+
+def write_corpus(directory: str, count: int) -> Dict[str, str]:
+    """Writes count statements per bank and returns each file's expected min_payment."""
+    expected = {}
+    for bank_key in parser.REGEX_TEMPLATES:
+        for seed in range(count):
+            pages, fields = generate_statement(bank_key, 1, 5, seed)
+            pages = [page.replace("Minimum Amount Due", HIDDEN_LABEL) for page in pages]
+            path = os.path.join(directory, f"{bank_key}_{seed:03d}.pdf")
+            with open(path, "wb") as f:
+                f.write(write_pdf(pages))
+            expected[path] = fields["min_payment"]
+    return expected
+
+
+def run(paths, expected, jobs: int, batcher: LLMBatcher = None):
+    started = time.perf_counter()
+    records = list(batch.run_batch(paths, jobs, api_key="simulated", llm_batcher=batcher))
+    elapsed = time.perf_counter() - started
+    answered = sum(1 for r in records if r.get("llm_status") == "SUCCESS")
+    correct = sum(1 for r in records if r.get("min_payment") == expected[r["file"]])
+    requests = batcher.requests if batcher else answered
+    return len(records), requests, elapsed, correct
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--count", type=int, default=10, help="Statements per bank")
+    arg_parser.add_argument("--jobs", type=int, default=2)
+    arg_parser.add_argument("--batch", type=int, default=20, help="Statements per batched request")
+    arg_parser.add_argument("--wait", type=float, default=1.0, help="Seconds a partial batch waits")
+    arg_parser.add_argument("--latency", type=float, default=0.8, help="Simulated seconds per request")
+    arg_parser.add_argument("--per-document", type=float, default=0.05, help="Simulated seconds per statement")
+    args = arg_parser.parse_args(argv)
+
+    client = SimulatedGemini(args.latency, args.per_document)
+    # Forked workers inherit the stand-in, so per-document calls made in the pool use it too
+    parser.get_default_client = lambda: client
+
+    with tempfile.TemporaryDirectory() as directory:
+        expected = write_corpus(directory, args.count)
+        paths = sorted(expected)
+        print(f"{len(paths)} statements, {args.jobs} workers, {args.latency:g}s + {args.per_document:g}s/statement per request")
+        print(f"{'mode':14} {'requests':>9} {'wall s':>8} {'correct':>9}")
+        count, requests, elapsed, correct = run(paths, expected, args.jobs)
+        print(f"{'per-document':14} {requests:9d} {elapsed:8.2f} {correct:5d}/{count}")
+        batcher = LLMBatcher("simulated", max_documents=args.batch, max_wait=args.wait, client=client)
+        try:
+            count, requests, elapsed, correct = run(paths, expected, args.jobs, batcher)
+        finally:
+            batcher.close()
+        print(f"{'batched':14} {requests:9d} {elapsed:8.2f} {correct:5d}/{count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Validates the combined and anchored per-field matchers against the sequential pattern loop and times all three.
+
+The corpus is the synthetic statements plus mutated copies that force the interesting paths:
+missing labels (later patterns win), zero totals and malformed amounts (validation rejects the
+first candidate), and values pushed far from their labels. Every bank's patterns run on every
+document. Two checks are made:
+  * each matcher's candidates() equal the (index, group 1) list of every pattern's first match
+  * extract_fields() returns the same fields under every strategy
+
+    python benchmarks/bench_matcher.py --count 5 --pages 10 --backend re2
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parser
+import pattern_registry
+from regex_patterns import REGEX_TEMPLATES
+from synthetic import generate_corpus
+
+MUTATIONS = {
+    "original": lambda text: text,
+    "no_total_labels": lambda text: re.sub(r"(?i)total", "Sum", text),
+    "no_minimum_labels": lambda text: re.sub(r"(?i)minimum", "Least", text),
+    "zero_amounts": lambda text: re.sub(r"\d[\d,]*\.\d\d", "0.00", text),
+    "malformed_amounts": lambda text: re.sub(r"(\d),(\d)", r"\1 ,\2", text),
+    "no_card_labels": lambda text: re.sub(r"(?i)card\s+n", "Plastic N", text),
+    "wide_gaps": lambda text: re.sub(r"(?<=[:a-z]) (?=\S)", " " * 150, text),
+    "far_from_label": lambda text: re.sub(r"(?i)(statement\s+period|due\s+date)", r"\1 " + "filler text " * 30, text),
+}
+
+
+def sequential_candidates(text: str, bank_key: str, key: str) -> list:
+    candidates = []
+    for index, pattern in enumerate(pattern_registry.get_patterns(bank_key).get(key, [])):
+        match = pattern.search(text)
+        if match:
+            candidates.append((index, match.group(1)))
+    return candidates
+
+
+def time_strategy(strategy: str, texts: list, repeat: int) -> float:
+    """Best of `repeat` passes of extract_fields for every bank over every text."""
+    pattern_registry.set_strategy(strategy)
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in texts:
+            for bank_key in REGEX_TEMPLATES:
+                parser.extract_fields(text, bank_key)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--count", type=int, default=3, help="Statements per bank")
+    arg_parser.add_argument("--pages", type=int, default=5)
+    arg_parser.add_argument("--transactions", type=int, default=40, help="Transactions per page")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Timed passes per strategy; the best is reported")
+    arg_parser.add_argument("--backend", choices=pattern_registry.BACKENDS, default=pattern_registry.get_backend())
+    args = arg_parser.parse_args(argv)
+
+    pattern_registry.set_backend(args.backend)
+    corpus = generate_corpus(None, args.count, args.pages, args.transactions)
+    texts = [mutate(doc["text"]) for doc in corpus for mutate in MUTATIONS.values()]
+
+    mismatches = 0
+    checks = 0
+    for text in texts:
+        for bank_key, template in REGEX_TEMPLATES.items():
+            for key in template["patterns"]:
+                checks += 1
+                expected = sequential_candidates(text, bank_key, key)
+                if list(pattern_registry.get_field_matcher(bank_key, key).candidates(text)) != expected:
+                    mismatches += 1
+                    print(f"Combined candidate mismatch: {bank_key}.{key}")
+                anchors = pattern_registry.build_anchor_index(text, bank_key)
+                if list(pattern_registry.get_anchored_matcher(bank_key, key).candidates(text, anchors)) != expected:
+                    mismatches += 1
+                    print(f"Anchored candidate mismatch: {bank_key}.{key}")
+            pattern_registry.set_strategy("sequential")
+            expected = parser.extract_fields(text, bank_key)
+            for strategy in ("combined", "anchored"):
+                pattern_registry.set_strategy(strategy)
+                if parser.extract_fields(text, bank_key) != expected:
+                    mismatches += 1
+                    print(f"Field mismatch ({strategy}): {bank_key}")
+
+    print(f"{len(texts)} documents x {len(REGEX_TEMPLATES)} banks, {checks} field checks, {mismatches} mismatches")
+    times = {strategy: time_strategy(strategy, texts, args.repeat) for strategy in pattern_registry.STRATEGIES}
+    print(f"best pass ({args.backend} backend):")
+    for strategy, seconds in times.items():
+        print(f"  {strategy:<10} {seconds:.3f}s  {times['sequential'] / seconds:.2f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
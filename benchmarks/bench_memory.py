@@ -0,0 +1,95 @@
+"""
+Peak memory of parse_statement on a long synthetic statement, per mode.
+
+Each mode (full, incremental, streaming) runs in its own child process, which reports its
+peak RSS, the time taken and whether the fields match the generator. The summary page is
+moved to the end so every mode has to read every page. The streaming child runs with
+PARSER_MEMORY_LIMIT_MB set to the ceiling, and the benchmark fails if it goes over.
+
+    python benchmarks/bench_memory.py --pages 300 --ceiling 120
+"""
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import generate_statement, write_pdf
+
+MODES = ["full", "incremental", "streaming"]
+
+
+def peak_rss_mb() -> float:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_child(mode: str, pdf_path: str, expected_path: str) -> None:
+    """Parses the PDF in the given mode and prints one JSON line of measurements."""
+    import parser
+
+    with open(pdf_path, "rb") as f:
+        pdf = io.BytesIO(f.read())
+    with open(expected_path, encoding="utf-8") as f:
+        expected = json.load(f)
+    started = time.perf_counter()
+    result = parser.parse_statement(pdf, incremental=mode == "incremental", streaming=mode == "streaming")
+    print(json.dumps({
+        "mode": mode,
+        "status": result.get("status"),
+        "reason": result.get("reason"),
+        "seconds": time.perf_counter() - started,
+        "peak_rss_mb": peak_rss_mb(),
+        "fields_ok": all(result.get(key) == value for key, value in expected.items()),
+    }))
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--bank", default="hdfc")
+    arg_parser.add_argument("--pages", type=int, default=300)
+    arg_parser.add_argument("--transactions", type=int, default=40, help="Transactions per page")
+    arg_parser.add_argument("--ceiling", type=float, default=120.0, help="Peak RSS allowed for streaming, in MB")
+    arg_parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    arg_parser.add_argument("--child", nargs=3, metavar=("MODE", "PDF", "EXPECTED"), help=argparse.SUPPRESS)
+    args = arg_parser.parse_args(argv)
+
+    if args.child:
+        run_child(*args.child)
+        return 0
+
+    pages, expected = generate_statement(args.bank, args.pages, args.transactions)
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, "statement.pdf")
+        expected_path = os.path.join(tmp, "expected.json")
+        with open(pdf_path, "wb") as f:
+            f.write(write_pdf(pages[1:] + pages[:1]))
+        with open(expected_path, "w", encoding="utf-8") as f:
+            json.dump(expected, f)
+
+        print(f"{args.pages} pages, {os.path.getsize(pdf_path) / 1024:.0f} KiB PDF, summary on the last page")
+        print(f"{'mode':<12} {'status':<8} {'fields':<7} {'seconds':>8} {'peak RSS MB':>12}")
+        over = False
+        for mode in args.modes:
+            env = dict(os.environ)
+            if mode == "streaming":
+                env["PARSER_MEMORY_LIMIT_MB"] = str(args.ceiling)
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode, pdf_path, expected_path],
+                                    capture_output=True, text=True, env=env, check=True).stdout
+            stats = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:<12} {stats['status']:<8} {'ok' if stats['fields_ok'] else 'WRONG':<7} "
+                  f"{stats['seconds']:>8.2f} {stats['peak_rss_mb']:>12.1f}")
+            if mode == "streaming" and (stats["status"] != "SUCCESS" or stats["peak_rss_mb"] > args.ceiling):
+                print(f"Streaming went over the {args.ceiling} MB ceiling: {stats['reason'] or stats['peak_rss_mb']}")
+                over = True
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""
+Latency of full text extraction on a long synthetic statement, per number of page workers.
+
+Each worker count reads the whole PDF through parser.read_pdf_pages (pool start-up excluded)
+and checks that the reassembled text is identical to the sequential read.
+
+    python benchmarks/bench_parallel.py --pages 200 --workers 1 2 4 8
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parser
+from synthetic import generate_statement, write_pdf
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--bank", default="hdfc")
+    arg_parser.add_argument("--pages", type=int, default=200)
+    arg_parser.add_argument("--transactions", type=int, default=40, help="Transactions per page")
+    arg_parser.add_argument("--backend", default=None, help="PDF backend (default pdfplumber)")
+    arg_parser.add_argument("--workers", type=int, nargs="+",
+                            default=sorted({1, 2, 4, os.cpu_count() or 1}), help="Worker counts to time")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args(argv)
+
+    pages, _ = generate_statement(args.bank, args.pages, args.transactions)
+    pdf = write_pdf(pages)
+    parser.PARALLEL_MIN_PAGES = 2
+
+    print(f"{args.pages} pages, {os.cpu_count()} CPUs")
+    print(f"{'workers':>7} {'seconds':>8} {'speedup':>8} {'text':>6}")
+    reference = None
+    baseline = None
+    for workers in args.workers:
+        if workers > 1:
+            # Start the pool outside the timed runs
+            parser.get_page_pool(workers).submit(int).result()
+        best = None
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            text = parser.extract_text_from_pdf(io.BytesIO(pdf), args.backend, workers)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        reference = reference if reference is not None else text
+        baseline = baseline or best
+        print(f"{workers:>7} {best:>8.2f} {baseline / best:>7.1f}x {'same' if text == reference else 'DIFF':>6}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
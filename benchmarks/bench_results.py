@@ -0,0 +1,73 @@
+"""
+Per-document memory and pickling cost of parse results.
+
+Parses synthetic statements and compares three shapes of the same result: the plain dict
+parse_statement used to return (raw_text included), a ParseResult holding raw_text compressed,
+and a ParseResult without raw_text, as batch.py, the HTTP service and the app request it.
+Reports the pickled size (what crosses a process boundary), the memory a result keeps alive
+once unpickled, and the pickle round-trip time.
+
+    python benchmarks/bench_results.py --pages 50
+"""
+import argparse
+import os
+import pickle
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parser
+from synthetic import generate_statement
+
+
+def resident_bytes(result, copies: int) -> float:
+    """Mean traced memory held by one unpickled copy of result."""
+    payload = pickle.dumps(result)
+    tracemalloc.start()
+    kept = [pickle.loads(payload) for _ in range(copies)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current / copies
+
+
+def round_trip_us(result, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        pickle.loads(pickle.dumps(result))
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--pages", type=int, default=20)
+    arg_parser.add_argument("--transactions", type=int, default=40, help="Transactions per page")
+    arg_parser.add_argument("--copies", type=int, default=200, help="Unpickled copies kept to measure memory")
+    args = arg_parser.parse_args(argv)
+
+    rows = {"dict": [], "compressed": [], "lean": []}
+    for bank_key in parser.REGEX_TEMPLATES:
+        page_texts, _ = generate_statement(bank_key, args.pages, args.transactions)
+        text = "".join(page + "\n" for page in page_texts)
+        shapes = {
+            "dict": parser.parse_text(text).to_dict(),
+            "compressed": parser.parse_text(text),
+            "lean": parser.parse_text(text, keep_raw_text=False),
+        }
+        for name, result in shapes.items():
+            rows[name].append((len(pickle.dumps(result)), resident_bytes(result, args.copies),
+                               round_trip_us(result, 50)))
+
+    print(f"{len(parser.REGEX_TEMPLATES)} statements of {args.pages} pages, mean per result")
+    print(f"{'shape':12} {'pickle B':>10} {'resident B':>11} {'round trip us':>14}")
+    for name, values in rows.items():
+        pickled, resident, micros = (statistics.mean(column) for column in zip(*values))
+        print(f"{name:12} {pickled:10.0f} {resident:11.0f} {micros:14.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Load test for server.py on synthetic statements.
+
+Starts the service in a child process, then keeps --concurrency clients posting PDFs for
+--requests requests in total, and reports throughput, latency percentiles and how many
+responses were 200, 503 (queue full) and 504 (deadline). Like a well-behaved client, a
+rejected request is retried after the Retry-After the server sent.
+
+    python benchmarks/bench_server.py --jobs 4 --queue 8 --concurrency 32 --requests 200
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+import aiohttp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import generate_corpus
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_up(session: aiohttp.ClientSession, url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            async with session.get(f"{url}/health") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            if time.monotonic() > deadline:
+                raise
+        await asyncio.sleep(0.2)
+
+
+async def load(url: str, pdfs, concurrency: int, total: int, timeout: float):
+    statuses = Counter()
+    latencies = []
+    sent = 0
+
+    async with aiohttp.ClientSession() as session:
+        await wait_until_up(session, url)
+
+        async def client():
+            nonlocal sent
+            while sent < total:
+                pdf = pdfs[sent % len(pdfs)]
+                sent += 1
+                started = time.perf_counter()
+                params = {"timeout": str(timeout)} if timeout else None
+                while True:
+                    async with session.post(f"{url}/parse", data=pdf, params=params,
+                                            headers={"Content-Type": "application/pdf"}) as response:
+                        await response.read()
+                        statuses[response.status] += 1
+                        retry_after = response.headers.get("Retry-After")
+                    if response.status != 503:
+                        break
+                    await asyncio.sleep(float(retry_after or 1))
+                if response.status == 200:
+                    latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        async with session.get(f"{url}/health") as response:
+            health = await response.json()
+    return statuses, latencies, elapsed, health
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    arg_parser.add_argument("--queue", type=int, default=8)
+    arg_parser.add_argument("--concurrency", type=int, default=16, help="Clients sending requests at once")
+    arg_parser.add_argument("--requests", type=int, default=100)
+    arg_parser.add_argument("--timeout", type=float, default=None, help="Per-request deadline sent to the server")
+    arg_parser.add_argument("--pages", type=int, default=3)
+    args = arg_parser.parse_args(argv)
+
+    pdfs = [doc["pdf"] for doc in generate_corpus(None, 2, args.pages)]
+    port = free_port()
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, "server.py"), "--port", str(port),
+                               "-j", str(args.jobs), "--queue", str(args.queue)])
+    try:
+        statuses, latencies, elapsed, health = asyncio.run(
+            load(f"http://127.0.0.1:{port}", pdfs, args.concurrency, args.requests, args.timeout))
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+    print(f"{args.jobs} worker(s), queue {args.queue}, {args.concurrency} clients, {args.requests} requests")
+    print(f"throughput     {statuses[200] / elapsed:8.1f} parses/s")
+    if latencies:
+        quantiles = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+        print(f"latency p50    {quantiles[49] * 1000:8.0f} ms")
+        print(f"latency p95    {quantiles[94] * 1000:8.0f} ms")
+        print(f"latency p99    {quantiles[98] * 1000:8.0f} ms")
+    print("responses      " + ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items())))
+    print(f"server         {health}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Stage-level benchmark on synthetic statements.
+
+Times extract_text_from_pdf, identify_bank, the RegEx loop (extract_fields), clean_amount,
+the typed batch normalization (amounts to paise, dates to ISO) and the whole parse_statement separately, and reports throughput, p50/p95/p99 latency,
+peak traced memory and, for parse_statement, field accuracy against the generator.
+Runs fully offline.
+
+    python benchmarks/bench_stages.py --count 5 --pages 20 --transactions 40
+    python benchmarks/bench_stages.py --stages regex identify --json results.json
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import normalize
+import parser
+import pattern_registry
+from synthetic import generate_corpus
+
+RAW_DATES = ["12/03/2023", "12-03-23", "05.11.2024", "12 Mar 2023", "Mar 12, 2023", "31/12/2024", "01/01/24"]
+RAW_AMOUNTS = ["22,935.00", "Rs. 1,150.00 Dr", "` 5,432.10", "₹ 12,00,000.50", "3210.55 CR", "0.00", "1.234.567,89"]
+
+
+def stage_calls(corpus: List[Dict]) -> Dict[str, List[Callable[[], object]]]:
+    """One zero-argument call per unit of work for each stage."""
+    return {
+        "extract_text": [lambda d=d: parser.extract_text_from_pdf(io.BytesIO(d["pdf"])) for d in corpus],
+        "identify": [lambda d=d: parser.identify_bank(d["text"]) for d in corpus],
+        "regex": [lambda d=d: parser.extract_fields(d["text"], d["bank"]) for d in corpus],
+        "clean_amount": [lambda: [parser.clean_amount(a) for a in RAW_AMOUNTS]] * (len(corpus) * 20),
+        "amounts_to_paise": [lambda: normalize.amounts_to_paise(RAW_AMOUNTS * 100)] * len(corpus),
+        "dates_to_iso": [lambda: normalize.dates_to_iso(RAW_DATES * 100, "hdfc")] * len(corpus),
+        "parse_statement": [lambda d=d: parser.parse_statement(io.BytesIO(d["pdf"])) for d in corpus],
+    }
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    return statistics.quantiles(sorted_values, n=100, method="inclusive")[int(q) - 1]
+
+
+def measure(calls: List[Callable[[], object]], repeat: int) -> Dict[str, float]:
+    """Times every call `repeat` times, then measures peak traced memory in a separate pass."""
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for call in calls:
+            t0 = time.perf_counter()
+            call()
+            latencies.append(time.perf_counter() - t0)
+    total = time.perf_counter() - started
+
+    # tracemalloc slows allocation-heavy code, so memory is measured apart from timing
+    tracemalloc.start()
+    peak = 0
+    for call in calls:
+        tracemalloc.reset_peak()
+        call()
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "calls": len(latencies),
+        "throughput_per_s": len(latencies) / total if total else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "peak_kib": peak / 1024,
+    }
+
+
+def accuracy(corpus: List[Dict]) -> float:
+    """Share of expected fields that parse_statement returns exactly."""
+    correct = total = 0
+    for doc in corpus:
+        result = parser.parse_statement(io.BytesIO(doc["pdf"]))
+        for key, value in doc["expected"].items():
+            total += 1
+            correct += result.get(key) == value
+    return correct / total if total else 0.0
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--banks", nargs="+", default=None, help="Banks to generate (default: all)")
+    arg_parser.add_argument("--count", type=int, default=3, help="Statements per bank")
+    arg_parser.add_argument("--pages", type=int, default=10)
+    arg_parser.add_argument("--transactions", type=int, default=40, help="Transactions per page")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="Timed passes over the corpus per stage")
+    arg_parser.add_argument("--stages", nargs="+", default=None, help="Stages to run (default: all)")
+    arg_parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON")
+    args = arg_parser.parse_args(argv)
+
+    corpus = generate_corpus(args.banks, args.count, args.pages, args.transactions)
+    pattern_registry.warmup()
+    calls = stage_calls(corpus)
+    stages = args.stages or list(calls)
+
+    results = {}
+    print(f"{len(corpus)} statements, {args.pages} pages each, {args.transactions} transactions per page")
+    print(f"{'stage':<16} {'calls':>6} {'per s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak KiB':>10}")
+    for stage in stages:
+        stats = measure(calls[stage], args.repeat)
+        results[stage] = stats
+        print(f"{stage:<16} {stats['calls']:>6} {stats['throughput_per_s']:>10.1f} {stats['p50_ms']:>9.3f} "
+              f"{stats['p95_ms']:>9.3f} {stats['p99_ms']:>9.3f} {stats['peak_kib']:>10.1f}")
+
+    if "parse_statement" in stages:
+        results["accuracy"] = accuracy(corpus)
+        print(f"\nparse_statement field accuracy: {results['accuracy']:.1%}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
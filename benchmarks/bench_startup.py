@@ -0,0 +1,94 @@
+"""
+Import-time budget for the core parsing paths.
+
+Each scenario runs in a fresh interpreter under -X importtime and adds up the time spent
+importing modules from `import parser` until its first parse is done:
+
+    text  parse_text on already-extracted text
+    pdf   parse_statement on a small PDF, RegEx only
+
+The benchmark fails if a scenario's best import time over --repeat runs goes over its budget, or if it
+loads a module its path does not need (pdfplumber for text, requests, pandas, streamlit).
+
+    python benchmarks/bench_startup.py --budget-ms 160 --text-budget-ms 40
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import generate_statement, write_pdf
+
+MARKER = "-- parser imports start --"
+HEAVY = ["pdfplumber", "pdfminer", "requests", "pandas", "streamlit"]
+FORBIDDEN = {
+    "text": ["pdfplumber", "pdfminer", "requests", "pandas", "streamlit"],
+    "pdf": ["requests", "pandas", "streamlit"],
+}
+
+CHILD = """
+import io, sys
+sys.path.insert(0, {root!r})
+print({marker!r}, file=sys.stderr, flush=True)
+import parser
+{run}
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(" ".join(heavy))
+"""
+RUNS = {
+    "text": "parser.parse_text(open({path!r}, encoding='utf-8').read())",
+    "pdf": "parser.parse_statement(io.BytesIO(open({path!r}, 'rb').read()))",
+}
+
+
+def run_scenario(scenario: str, path: str) -> tuple:
+    """Runs one scenario in a fresh interpreter; returns import milliseconds and the heavy modules loaded."""
+    code = CHILD.format(root=ROOT, marker=MARKER, heavy=HEAVY, run=RUNS[scenario].format(path=path))
+    done = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True,
+                          check=True, cwd=ROOT)
+    lines = done.stderr.split(MARKER, 1)[1].splitlines()
+    micros = sum(int(line.split("|")[0].split(":")[1]) for line in lines if line.startswith("import time:")
+                 and line.split("|")[0].split(":")[1].strip().isdigit())
+    return micros / 1000, done.stdout.split()
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--budget-ms", type=float, default=160.0,
+                            help="Import budget of the PDF path (pdfplumber alone takes about 120 ms)")
+    arg_parser.add_argument("--text-budget-ms", type=float, default=40.0, help="Import budget of the text path")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args(argv)
+    budgets = {"text": args.text_budget_ms, "pdf": args.budget_ms}
+
+    pages, _ = generate_statement("hdfc", 2, 10)
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {"text": os.path.join(tmp, "statement.txt"), "pdf": os.path.join(tmp, "statement.pdf")}
+        with open(paths["text"], "w", encoding="utf-8") as f:
+            f.write("\n".join(pages))
+        with open(paths["pdf"], "wb") as f:
+            f.write(write_pdf(pages))
+
+        print(f"{'path':<6} {'best ms':>10} {'budget ms':>10}  heavy modules loaded")
+        for scenario in RUNS:
+            runs = [run_scenario(scenario, paths[scenario]) for _ in range(args.repeat)]
+            best = min(ms for ms, _ in runs)
+            loaded = runs[-1][1]
+            print(f"{scenario:<6} {best:>10.1f} {budgets[scenario]:>10.1f}  {', '.join(loaded) or '-'}")
+            unexpected = [name for name in loaded if name in FORBIDDEN[scenario]]
+            if best > budgets[scenario]:
+                print(f"  over budget by {best - budgets[scenario]:.1f} ms")
+                failed = True
+            if unexpected:
+                print(f"  imports modules this path does not need: {', '.join(unexpected)}")
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
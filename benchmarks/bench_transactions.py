@@ -0,0 +1,85 @@
+"""
+Transaction table extraction on synthetic statements.
+
+For each bank, extracts the transactions of a generated statement, checks the row count,
+amounts and Cr/Dr flags against the generated lines, and compares the column-wise
+normalization in transactions.normalize_transactions with a per-row clean_amount/strptime loop.
+
+    python benchmarks/bench_transactions.py --pages 20 --transactions 40
+"""
+import argparse
+import datetime
+import io
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import transactions
+from parser import clean_amount
+from regex_patterns import REGEX_TEMPLATES
+from synthetic import generate_statement, write_pdf
+
+GENERATED_ROW_RE = re.compile(r"^(\d{2}/\d{2}/\d{4}) .+ ([\d,]+\.\d{2})( Cr)?$")
+
+
+def normalize_per_row(rows) -> list:
+    """The row-at-a-time equivalent of normalize_transactions, for comparison."""
+    out = []
+    for date, amount, direction in zip(rows["date"], rows["amount"], rows["direction"]):
+        value = float(clean_amount(amount))
+        credit = direction.upper() == "CR"
+        out.append((datetime.datetime.strptime(date, transactions.DEFAULT_DATE_FORMAT), value,
+                    "CR" if credit else "DR", -value if credit else value))
+    return out
+
+
+def best_of(repeat: int, fn, *args) -> float:
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--pages", type=int, default=20)
+    arg_parser.add_argument("--transactions", type=int, default=40, help="Transactions per page")
+    arg_parser.add_argument("--draw-order", choices=["reading", "reverse"], default="reading")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args(argv)
+
+    print(f"{'bank':<8} {'rows':>6} {'expected':>9} {'correct':>8} {'extract s':>10} "
+          f"{'columns ms':>11} {'per-row ms':>11}")
+    wrong = 0
+    for bank_key in REGEX_TEMPLATES:
+        pages, _ = generate_statement(bank_key, args.pages, args.transactions)
+        pdf = write_pdf(pages, args.draw_order)
+        expected = [GENERATED_ROW_RE.match(line).groups() for page in pages[1:] for line in page.splitlines()
+                    if GENERATED_ROW_RE.match(line)]
+
+        started = time.perf_counter()
+        rows = transactions.extract_transaction_rows(io.BytesIO(pdf))
+        extract_seconds = time.perf_counter() - started
+        table = transactions.normalize_transactions(rows)
+
+        correct = sum(
+            row.date.strftime("%d/%m/%Y") == date and f"{row.amount:.2f}" == amount.replace(",", "")
+            and row.direction == ("CR" if credit else "DR")
+            for row, (date, amount, credit) in zip(table.itertuples(), expected)
+        )
+        wrong += len(expected) - correct + abs(len(table) - len(expected))
+        columns_ms = best_of(args.repeat, transactions.normalize_transactions, rows) * 1000
+        per_row_ms = best_of(args.repeat, normalize_per_row, rows) * 1000
+        print(f"{bank_key:<8} {len(table):>6} {len(expected):>9} {correct:>8} {extract_seconds:>10.2f} "
+              f"{columns_ms:>11.2f} {per_row_ms:>11.2f}")
+    return 1 if wrong else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Adversarial-input benchmark for every template pattern.
+
+Runs each pattern in REGEX_TEMPLATES (and the special HDFC/IDFC extractor patterns)
+against inputs built to trigger heavy backtracking, on the re backend and, when
+installed, the re2 backend. Reports the worst-case search time per pattern.
+
+    python benchmarks/redos.py --size 50000 --budget 0.25 --top 20
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parser
+import pattern_registry
+from regex_patterns import REGEX_TEMPLATES
+
+
+def adversarial_inputs(size: int) -> dict:
+    """Inputs of roughly `size` characters that keep labels matching while the values never complete."""
+    def fill(unit: str) -> str:
+        return unit * max(1, size // len(unit))
+
+    return {
+        "period_without_to": fill("Statement Period 01/01/2023 "),
+        "summary_without_dues": "Account Summary " + fill("Opening Balance 1,000 "),
+        "labels_without_values": fill("Total Dues Minimum Amount Due Payment Due Date Card No Statement Date "),
+        "masked_digits_run": fill("X"),
+        "mask_and_spaces": fill("XXXX "),
+        "card_label_then_text": fill("Card Number : abc "),
+        "comma_digit_runs": "Total Amount Due " + fill("1,"),
+        "whitespace_flood": "Total Dues" + fill(" \n") + "x",
+        "payment_then_total": fill("Payment Due Date Total Amount Due 1.0 "),
+    }
+
+
+def special_patterns() -> list:
+    """Compiled module-level patterns of the special extractors in parser.py."""
+    return [(f"parser.{name}", getattr(parser, name)) for name in sorted(dir(parser))
+            if name.startswith(("HDFC_", "IDFC_")) and name.endswith("_RE")]
+
+
+def time_search(pattern, text: str) -> float:
+    started = time.perf_counter()
+    pattern.search(text)
+    return time.perf_counter() - started
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--size", type=int, default=5000, help="Approximate length of each adversarial input")
+    arg_parser.add_argument("--budget", type=float, default=pattern_registry.PATTERN_BUDGET_SECONDS,
+                            help="Per-pattern wall-clock budget in seconds")
+    arg_parser.add_argument("--top", type=int, default=15, help="Rows to print, slowest first")
+    args = arg_parser.parse_args(argv)
+
+    inputs = adversarial_inputs(args.size)
+    backends = ["re"] + (["re2"] if pattern_registry.compile_re2("a") is not None else [])
+
+    rows = []
+    for bank_key, template in REGEX_TEMPLATES.items():
+        for key, pattern_strs in template["patterns"].items():
+            for index, pattern_str in enumerate(pattern_strs):
+                for backend in backends:
+                    pattern = pattern_registry.compile_pattern(pattern_str, backend)
+                    actual = "re2" if type(pattern).__module__.startswith("re2") else "re"
+                    if actual != backend:
+                        continue
+                    worst, worst_input = max((time_search(pattern, text), name) for name, text in inputs.items())
+                    rows.append((worst, f"{bank_key}.{key}[{index}]", backend, worst_input))
+    for name, pattern in special_patterns():
+        worst, worst_input = max((time_search(pattern, text), label) for label, text in inputs.items())
+        rows.append((worst, name, "re", worst_input))
+
+    rows.sort(reverse=True)
+    print(f"{'worst (s)':>10}  {'backend':<7}  {'pattern':<32}  input")
+    for worst, name, backend, worst_input in rows[:args.top]:
+        print(f"{worst:10.4f}  {backend:<7}  {name:<32}  {worst_input}")
+
+    over = [row for row in rows if row[0] > args.budget]
+    print(f"\n{len(rows)} pattern/backend pairs on {len(inputs)} inputs of ~{args.size} chars; "
+          f"{len(over)} over the {args.budget}s budget.")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""
+Synthetic credit card statements for benchmarks.
+
+Generates realistic statement text and PDFs for every bank in REGEX_TEMPLATES, with
+configurable page counts and transaction volumes, together with the field values a
+correct parse must return. PDFs are written by a small built-in writer, so nothing
+beyond the standard library is needed.
+
+    python benchmarks/synthetic.py --out fixtures --count 5 --pages 20 --transactions 40
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import sys
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from regex_patterns import REGEX_TEMPLATES
+
+MERCHANTS = ["AMAZON SELLER SERVICES", "SWIGGY", "ZOMATO", "UBER INDIA", "IRCTC E-TICKET", "BIGBASKET",
+             "MYNTRA DESIGNS", "NETFLIX.COM", "SHELL FUEL STATION", "RELIANCE SMART", "APOLLO PHARMACY",
+             "BOOKMYSHOW", "MAKEMYTRIP", "DECATHLON SPORTS", "CROMA RETAIL"]
+CITIES = ["MUMBAI", "BANGALORE", "NEW DELHI", "PUNE", "CHENNAI", "HYDERABAD", "KOLKATA", "GURGAON"]
+
+# Summary page per bank, written in the label style each bank's templates are built for
+SUMMARY_LAYOUTS = {
+    "hdfc": """HDFC BANK Credit Card Statement
+Name : {name} Statement Date:{statement_date}
+Card No: 4567 89XX XXXX {card}
+Address : {address}
+Payment Due Date
+{due_date}
+Total Dues
+{total_due}
+Minimum Amount Due : {min_payment}
+Account Summary
+Opening Balance Payment/ Credits Purchase/ Debits Finance Charges Total Dues
+{opening} {payments} {purchases} 0.00 {total_due}
+Reward Points Summary
+Opening Earned Redeemed Closing
+{points} 120 0 {points}""",
+    "axis": """FLIPKART AXIS BANK CREDIT CARD STATEMENT
+{name}
+{address}
+Credit Card Number: 5334 XXXX XXXX {card}
+Statement Generation Date: {statement_date}
+Payment Due Date: {due_date}
+Total Payment Due: Rs. {total_due} Dr
+Minimum Amount Due: Rs. {min_payment} Dr
+Previous Balance Payments Purchases
+{opening} {payments} {purchases}""",
+    "icici": """ICICI Bank Credit Card Statement
+{name}
+{address}
+Card Number: 4375 XXXX XXXX {card}
+Statement Date: {statement_date}
+Payment Due Date: {due_date}
+Your Total Amount Due : Rs. {total_due}
+Minimum Amount Due : Rs. {min_payment}
+Previous Balance Purchases Payments
+{opening} {purchases} {payments}""",
+    "idfc": """IDFC FIRST BANK
+Credit Card Statement
+{name}
+{address}
+Card Number: XXXX XXXX XXXX {card}
+Statement Date: {statement_date}
+STATEMENT SUMMARY
+Total Amount Due
+` {total_due}
+Minimum Amount Due
+` {min_payment}
+Payment Due Date
+{due_date}
+Opening Balance Purchases Payments
+{opening} {purchases} {payments}""",
+    "yes": """YES BANK Credit Card Statement
+{name}
+{address}
+Card Number: 5241XXXXXXXX{card}
+Statement Date: {statement_date}
+Payment Due Date: {due_date}
+Total Dues: Rs. {total_due}
+Minimum Amount Due: Rs. {min_payment}
+Previous Balance Payments Purchases
+{opening} {payments} {purchases}""",
+}
+
+NAMES = ["RAHUL SHARMA", "PRIYA NAIR", "ARJUN MEHTA", "SNEHA IYER", "VIKRAM SINGH", "ANANYA RAO"]
+STREETS = ["12 MG ROAD", "45 LINKING ROAD", "7 PARK STREET", "88 ANNA SALAI", "3 FC ROAD"]
+
+
+def money(value: float) -> str:
+    """Formats an amount the way statements print it, e.g. 22,935.00."""
+    return f"{value:,.2f}"
+
+
+def generate_statement(bank_key: str, pages: int = 3, transactions_per_page: int = 40,
+                       seed: int = 0) -> Tuple[List[str], Dict[str, str]]:
+    """
+    Returns the text of each page and the field values a correct parse must produce.
+    Page 1 is the summary; the remaining pages hold transactions.
+    """
+    rng = random.Random(f"{bank_key}:{seed}")
+    statement_date = datetime.date(2023, 1, 1) + datetime.timedelta(days=rng.randrange(700))
+    due_date = statement_date + datetime.timedelta(days=20)
+    period_start = statement_date - datetime.timedelta(days=30)
+
+    opening = round(rng.uniform(1000, 40000), 2)
+    purchases = round(rng.uniform(opening * 0.5, opening * 1.5), 2)
+    payments = round(rng.uniform(0, purchases * 0.9), 2)
+    total_due = round(opening - payments + purchases, 2)
+    min_payment = round(max(200.0, total_due * 0.05), 2)
+    card = f"{rng.randrange(10000):04d}"
+
+    summary = SUMMARY_LAYOUTS[bank_key].format(
+        name=rng.choice(NAMES),
+        address=f"{rng.choice(STREETS)} {rng.choice(CITIES)} {rng.randrange(400001, 700000)}",
+        statement_date=statement_date.strftime("%d/%m/%Y"),
+        due_date=due_date.strftime("%d/%m/%Y"),
+        card=card,
+        total_due=money(total_due),
+        min_payment=money(min_payment),
+        opening=money(opening),
+        payments=money(payments),
+        purchases=money(purchases),
+        points=rng.randrange(100, 9000),
+    )
+
+    page_texts = [summary]
+    for page_number in range(2, pages + 1):
+        lines = [f"Page {page_number} of {pages}", "Domestic Transactions", "Date Transaction Details Amount (in Rs.)"]
+        for _ in range(transactions_per_page):
+            day = period_start + datetime.timedelta(days=rng.randrange(31))
+            if rng.random() < 0.05:
+                # Payments often name another bank; identification must still pick the issuer
+                lines.append(f"{day.strftime('%d/%m/%Y')} BBPS PAYMENT VIA HDFC BANK NETBANKING {money(rng.uniform(500, 20000))} Cr")
+            else:
+                lines.append(f"{day.strftime('%d/%m/%Y')} {rng.choice(MERCHANTS)} {rng.choice(CITIES)} "
+                             f"{money(rng.uniform(50, 15000))}")
+        page_texts.append("\n".join(lines))
+
+    expected = {
+        "statement_date": statement_date.strftime("%d/%m/%Y"),
+        "payment_due_date": due_date.strftime("%d/%m/%Y"),
+        "total_due": f"{total_due:.2f}",
+        "min_payment": f"{min_payment:.2f}",
+        "card_last_4_digits": card,
+    }
+    return page_texts, expected
+
+
+def write_pdf(page_texts: List[str], draw_order: str = "reading") -> bytes:
+    """
+    Writes a minimal PDF with one Helvetica text page per entry, one line per text line.
+    With draw_order="reverse" each page's lines are drawn bottom-up at their usual positions, as some
+    statement generators do; the page looks the same but its content stream is out of reading order.
+    """
+    objects = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    pages_id = font_id + 2 * len(page_texts) + 1
+    page_ids = []
+    for text in page_texts:
+        operations = ["BT /F1 9 Tf 11 TL 36 806 Td"]
+        lines = list(enumerate(text.split("\n")))
+        for number, line in (reversed(lines) if draw_order == "reverse" else lines):
+            escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            if draw_order == "reverse":
+                operations.append(f"1 0 0 1 36 {806 - 11 * number} Tm ({escaped}) Tj")
+            else:
+                operations.append(f"({escaped}) Tj T*")
+        operations.append("ET")
+        stream = "\n".join(operations).encode("cp1252", "replace")
+        content_id = add(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R >> >> >>" % (pages_id, content_id, font_id)
+        ))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids).encode()
+    add(b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids)))
+    catalog_id = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog_id, xref)
+    return bytes(pdf)
+
+
+def generate_corpus(banks: List[str] = None, count: int = 3, pages: int = 3,
+                    transactions_per_page: int = 40, draw_order: str = "reading") -> List[Dict]:
+    """Builds count statements per bank as dicts with bank, pages, text, pdf and expected fields."""
+    corpus = []
+    for bank_key in banks or list(REGEX_TEMPLATES):
+        for seed in range(count):
+            page_texts, expected = generate_statement(bank_key, pages, transactions_per_page, seed)
+            corpus.append({
+                "bank": bank_key,
+                "seed": seed,
+                "pages": page_texts,
+                "text": "".join(page + "\n" for page in page_texts),
+                "pdf": write_pdf(page_texts, draw_order),
+                "expected": expected,
+            })
+    return corpus
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--out", required=True, help="Directory for the PDFs and expected.json")
+    arg_parser.add_argument("--banks", nargs="+", choices=list(REGEX_TEMPLATES), default=list(REGEX_TEMPLATES))
+    arg_parser.add_argument("--count", type=int, default=3, help="Statements per bank")
+    arg_parser.add_argument("--pages", type=int, default=3)
+    arg_parser.add_argument("--transactions", type=int, default=40, help="Transactions per page")
+    args = arg_parser.parse_args(argv)
+
+    os.makedirs(args.out, exist_ok=True)
+    expected = {}
+    for doc in generate_corpus(args.banks, args.count, args.pages, args.transactions):
+        name = f"{doc['bank']}_{doc['seed']:03d}.pdf"
+        with open(os.path.join(args.out, name), "wb") as f:
+            f.write(doc["pdf"])
+        expected[name] = dict(doc["expected"], bank=doc["bank"])
+    with open(os.path.join(args.out, "expected.json"), "w", encoding="utf-8") as f:
+        json.dump(expected, f, indent=2)
+    print(f"Wrote {len(expected)} statements to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
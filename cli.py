@@ -0,0 +1,65 @@
+"""
+Command-line parser for one-off and short-lived jobs.
+
+    python -m cli statement.pdf [more.pdf ...]
+    python -m cli --text extracted.txt
+    pdftotext statement.pdf - | python -m cli --text -
+
+Prints one JSON record per input. Only the code paths an invocation needs are imported:
+text inputs never load pdfplumber, and requests is only loaded when the LLM fallback runs.
+"""
+import argparse
+import json
+import os
+import sys
+from typing import List
+
+
+def main(argv: List[str] = None) -> int:
+    arg_parser = argparse.ArgumentParser(prog="python -m cli", description="Parse credit card statements.")
+    arg_parser.add_argument("inputs", nargs="+", help="PDF files, or text files with --text ('-' reads stdin)")
+    arg_parser.add_argument("--text", action="store_true", help="Inputs are already-extracted statement text")
+    arg_parser.add_argument("--incremental", action="store_true", help="Stop reading pages once all fields are found")
+    arg_parser.add_argument("--streaming", action="store_true", help="Keep only a rolling window of text")
+    arg_parser.add_argument("--typed", action="store_true", help="Amounts as whole paise, dates as YYYY-MM-DD")
+    arg_parser.add_argument("--llm", action="store_true", help="Use the Gemini fallback (GEMINI_API_KEY)")
+    arg_parser.add_argument("--raw-text", action="store_true", help="Include the extracted text in the output")
+    args = arg_parser.parse_args(argv)
+
+    api_key = None
+    if args.llm:
+        try:
+            from dotenv import load_dotenv
+            load_dotenv()
+        except ImportError:
+            pass
+        api_key = os.environ.get("GEMINI_API_KEY")
+
+    import parser
+
+    failed = 0
+    for path in args.inputs:
+        try:
+            if args.text:
+                if path == "-":
+                    text = sys.stdin.read()
+                else:
+                    with open(path, encoding="utf-8") as f:
+                        text = f.read()
+                result = parser.parse_text(text, api_key, keep_raw_text=args.raw_text)
+            else:
+                result = parser.parse_statement(path, api_key=api_key, incremental=args.incremental,
+                                                streaming=args.streaming, keep_raw_text=args.raw_text)
+        except OSError as e:
+            result = {"status": "ERROR", "reason": f"{type(e).__name__}: {e}"}
+        if args.typed and result.get("status") == "SUCCESS":
+            import normalize
+            result = normalize.normalize_fields(result, parser.bank_key_for(result))
+        if result.get("status") != "SUCCESS":
+            failed += 1
+        print(json.dumps(dict(file=path, **result), ensure_ascii=False))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
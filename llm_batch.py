@@ -0,0 +1,89 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import parser
+from llm_client import GeminiClient
+
+# Flush policy: a batch is sent once it holds BATCH_DOCUMENTS statements or BATCH_CHARS characters
+# of context, or once its oldest statement has waited BATCH_WAIT_SECONDS
+BATCH_DOCUMENTS = 20
+BATCH_CHARS = 40000
+BATCH_WAIT_SECONDS = 2.0
+# Batches sent at the same time; later ones queue behind them
+BATCH_REQUESTS_IN_FLIGHT = 2
+
+
+class LLMBatcher:
+    """
+    Collects LLM fallback requests (the llm_request of PENDING results, see parse_statement's defer_llm)
+    from many statements and answers each batch with one Gemini call (parser.extract_batch_with_llm).
+    Batches are sent on background threads, so the caller keeps collecting while one is in flight.
+    Nothing is sent on a timer: the caller calls poll() (or waits up to seconds_until_due()) to let a
+    batch go out once its oldest request is due.
+    """
+
+    def __init__(self, api_key: str, max_documents: int = BATCH_DOCUMENTS, max_chars: int = BATCH_CHARS,
+                 max_wait: float = BATCH_WAIT_SECONDS, max_in_flight: int = BATCH_REQUESTS_IN_FLIGHT,
+                 client: GeminiClient = None):
+        self.api_key = api_key
+        self.max_documents = max_documents
+        self.max_chars = max_chars
+        self.max_wait = max_wait
+        self.client = client
+        self.in_flight: List[Future] = []
+        self.requests = 0
+        self.documents = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="llm-batch")
+        self._jobs: List[Tuple[Hashable, List[str], str]] = []
+        self._chars = 0
+        self._oldest = None
+
+    def add(self, key: Hashable, request: Dict[str, Any]) -> None:
+        """Queues one statement's llm_request; key identifies its answer in poll()."""
+        context = request["context"]
+        if self._jobs and self._chars + len(context) > self.max_chars:
+            self.flush()
+        if not self._jobs:
+            self._oldest = time.monotonic()
+        self._jobs.append((key, request["fields"], context))
+        self._chars += len(context)
+        if len(self._jobs) >= self.max_documents:
+            self.flush()
+
+    def seconds_until_due(self) -> Optional[float]:
+        """How long the queued batch can still wait; None when nothing is queued."""
+        if not self._jobs:
+            return None
+        return max(0.0, self._oldest + self.max_wait - time.monotonic())
+
+    def flush(self) -> None:
+        """Sends the queued requests as one batch."""
+        if not self._jobs:
+            return
+        jobs, self._jobs, self._chars, self._oldest = self._jobs, [], 0, None
+        self.requests += 1
+        self.documents += len(jobs)
+        self.in_flight.append(self._executor.submit(self._send, jobs))
+
+    def _send(self, jobs: List[Tuple[Hashable, List[str], str]]) -> List[Tuple[Hashable, Dict[str, Any]]]:
+        # Document IDs are positions in the batch, so no file names or other keys reach the model
+        batch = [(str(index), fields, context) for index, (_, fields, context) in enumerate(jobs)]
+        answers = parser.extract_batch_with_llm(batch, self.api_key, self.client)
+        return [(key, answers[str(index)]) for index, (key, _, _) in enumerate(jobs)]
+
+    def poll(self, block: bool = False) -> List[Tuple[Hashable, Dict[str, Any]]]:
+        """
+        (key, LLM result) pairs from the batches that have finished; the queued batch is sent first
+        if it is due. With block=True everything queued is sent and waited for.
+        """
+        if block or self.seconds_until_due() == 0:
+            self.flush()
+        if block:
+            wait(self.in_flight)
+        done = [future for future in self.in_flight if future.done()]
+        self.in_flight = [future for future in self.in_flight if future not in done]
+        return [answer for future in done for answer in future.result()]
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
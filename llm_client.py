@@ -0,0 +1,153 @@
+import random
+import threading
+from typing import TYPE_CHECKING, Dict, Any, Tuple
+
+if TYPE_CHECKING:
+    import aiohttp
+    import requests
+
+# requests, urllib3, asyncio and aiohttp are imported on first use, so importing the parser
+# for RegEx-only work does not pay for the HTTP stack
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class GeminiClient:
+    """
+    Reusable HTTP client for the Gemini API.
+    Keeps pooled keep-alive connections, bounds every request with connect/read timeouts,
+    retries 429/5xx and failed connections with exponential backoff and caps the number of requests
+    in flight, across threads for post_json and per event loop for apost_json. A read timeout is not
+    retried, so a hung call costs one read_timeout at most.
+    """
+
+    def __init__(self, connect_timeout: float = 5.0, read_timeout: float = 60.0, max_retries: int = 3,
+                 backoff_factor: float = 0.5, max_backoff: float = 20.0, max_in_flight: int = 8):
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.max_in_flight = max_in_flight
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._session = None
+        self._session_lock = threading.Lock()
+        # aiohttp sessions and asyncio semaphores belong to the event loop they were made on, so each
+        # loop gets its own
+        self._async_sessions = {}
+        self._async_slots = {}
+
+    def _get_session(self) -> "requests.Session":
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    from urllib3.util.retry import Retry
+
+                    retry = Retry(
+                        total=self.max_retries,
+                        read=0,  # a timed-out generateContent call is not worth waiting for again
+                        backoff_factor=self.backoff_factor,
+                        backoff_max=self.max_backoff,
+                        status_forcelist=RETRY_STATUSES,
+                        allowed_methods=None,  # generateContent is a POST; retry it too
+                        respect_retry_after_header=True,
+                        raise_on_status=False,
+                    )
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_in_flight, max_retries=retry)
+                    session = requests.Session()
+                    session.mount("https://", adapter)
+                    session.headers["Content-Type"] = "application/json"
+                    self._session = session
+        return self._session
+
+    def post_json(self, url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POSTs a JSON payload and returns the decoded response; raises requests exceptions on failure."""
+        with self._slots:
+            response = self._get_session().post(url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _get_async_session(self) -> "aiohttp.ClientSession":
+        import asyncio
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        session = self._async_sessions.get(loop)
+        if session is None or session.closed:
+            for stale in [other for other in self._async_sessions if other.is_closed()]:
+                # Its loop is gone, so the session cannot be awaited closed; this drops its dead
+                # connections (what aiohttp does itself on garbage collection) without the warnings
+                stale_session = self._async_sessions.pop(stale)
+                self._async_slots.pop(stale, None)
+                stale_session.connector._close()
+                stale_session.detach()
+            timeout = aiohttp.ClientTimeout(sock_connect=self.timeout[0], sock_read=self.timeout[1])
+            connector = aiohttp.TCPConnector(limit=self.max_in_flight)
+            session = self._async_sessions[loop] = aiohttp.ClientSession(timeout=timeout, connector=connector)
+            self._async_slots[loop] = asyncio.Semaphore(self.max_in_flight)
+        return session
+
+    async def apost_json(self, url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async variant of post_json for overlapping many calls on one event loop; works from any
+        number of loops, e.g. successive asyncio.run() calls. Requires aiohttp; raises
+        aiohttp.ClientResponseError on a final HTTP error status and aiohttp.ClientConnectionError
+        when the connection still fails after the last retry.
+        """
+        import asyncio
+        import aiohttp
+
+        session = self._get_async_session()
+        slots = self._async_slots[asyncio.get_running_loop()]
+        for attempt in range(self.max_retries + 1):
+            async with slots:
+                try:
+                    async with session.post(url, json=payload) as response:
+                        if response.status in RETRY_STATUSES and attempt < self.max_retries:
+                            retry_after = response.headers.get("Retry-After", "")
+                            delay = float(retry_after) if retry_after.isdigit() else self._backoff(attempt)
+                        else:
+                            response.raise_for_status()
+                            return await response.json(content_type=None)
+                except aiohttp.ClientConnectionError as e:
+                    # As in post_json, a read timeout is not retried (a connect timeout is)
+                    read_timeout = isinstance(e, aiohttp.ServerTimeoutError) and \
+                        not isinstance(e, getattr(aiohttp, "ConnectionTimeoutError", ()))
+                    if read_timeout or attempt == self.max_retries:
+                        raise
+                    delay = self._backoff(attempt)
+            await asyncio.sleep(delay)
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    async def aclose(self) -> None:
+        """Closes the running loop's session; call it before that loop ends."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        self._async_slots.pop(loop, None)
+        session = self._async_sessions.pop(loop, None)
+        if session is not None:
+            await session.close()
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_default_client() -> GeminiClient:
+    """Process-wide client, so every caller shares one connection pool and in-flight cap."""
+    global _default_client
+    if _default_client is None:
+        with _default_lock:
+            if _default_client is None:
+                _default_client = GeminiClient()
+    return _default_client
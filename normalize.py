@@ -0,0 +1,133 @@
+import datetime
+import re
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+NON_AMOUNT_CHARS_RE = re.compile(r'[^\d.]')
+
+MONTHS = {name: number for number, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+
+AMOUNT_FIELDS = ["total_due", "min_payment"]
+DATE_FIELDS = ["statement_date", "payment_due_date"]
+
+
+def clean_amount(value: str) -> str:
+    """
+    The amount as a string of digits with at most one decimal point, e.g. "Rs. 22,935.00 Dr" -> "22935.00".
+    Everything but digits and dots is dropped, and when several dots remain only the last one is kept.
+    """
+    if not value:
+        return value
+    value = NON_AMOUNT_CHARS_RE.sub('', value)
+    if value.count('.') > 1:
+        head, _, tail = value.rpartition('.')
+        value = head.replace('.', '') + '.' + tail
+    return value
+
+
+def clean_amounts(values: Iterable[str]) -> List[str]:
+    """clean_amount over a batch of values."""
+    return list(map(clean_amount, values))
+
+
+def _cleaned_to_paise(value: str) -> Optional[int]:
+    whole, _, fraction = value.partition('.')
+    if not whole and not fraction:
+        return None
+    if len(fraction) <= 2:
+        return int(whole or 0) * 100 + int(fraction.ljust(2, '0'))
+    # More than two decimals (e.g. a misread "22.935,00"): round half up to the nearest paisa
+    return int((Decimal(value) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def amounts_to_paise(values: Iterable[str]) -> List[Optional[int]]:
+    """Amounts as whole paise (fixed-point, two decimals); None where a value holds no digits."""
+    return [_cleaned_to_paise(value) if value else None for value in map(clean_amount, values)]
+
+
+def amounts_to_decimal(values: Iterable[str]) -> List[Optional[Decimal]]:
+    """Amounts as Decimals with two decimal places; None where a value holds no digits."""
+    return [Decimal(paise).scaleb(-2) if paise is not None else None for paise in amounts_to_paise(values)]
+
+
+def _year(text: str) -> int:
+    year = int(text)
+    return year + 2000 if year < 100 else year
+
+
+def _month(text: str) -> int:
+    return MONTHS[text[:3].lower()]
+
+
+# Date layouts the templates' DATE_PATTERNS match, as (pattern, (year, month, day) builder).
+# Numeric dates are read day first, as Indian statements print them; month first (MONTH_FIRST)
+# is only tried when day first cannot be right and never becomes a bank's first choice
+DATE_LAYOUTS: List[Tuple[re.Pattern, Callable[[re.Match], Tuple[int, int, int]]]] = [
+    (re.compile(r"(\d{1,2})[/\-.](\d{1,2})[/\-.](\d{2,4})"),
+     lambda m: (_year(m[3]), int(m[2]), int(m[1]))),
+    (re.compile(r"(\d{1,2})\s+([A-Za-z]{3})[a-z]*,?\s+(\d{2,4})"),
+     lambda m: (_year(m[3]), _month(m[2]), int(m[1]))),
+    (re.compile(r"([A-Za-z]{3})[a-z]*\s+(\d{1,2}),?\s+(\d{2,4})"),
+     lambda m: (_year(m[3]), _month(m[1]), int(m[2]))),
+    (re.compile(r"(\d{1,2})[/\-.](\d{1,2})[/\-.](\d{2,4})"),
+     lambda m: (_year(m[3]), int(m[1]), int(m[2]))),
+]
+MONTH_FIRST = 3
+
+# Per bank, the index of the layout that last parsed one of its dates; tried first next time
+_date_layouts: Dict[str, int] = {}
+
+
+def _parse_date(value: str, order: List[int]) -> Tuple[Optional[datetime.date], Optional[int]]:
+    for index in order:
+        pattern, build = DATE_LAYOUTS[index]
+        match = pattern.fullmatch(value)
+        if match is None:
+            continue
+        try:
+            return datetime.date(*build(match)), index
+        except (KeyError, ValueError):
+            # Not a month name, or out of range in this layout (e.g. month 25); try the next
+            continue
+    return None, None
+
+
+def dates_to_iso(values: Iterable[str], bank_key: str = None) -> List[Optional[str]]:
+    """
+    Dates as ISO strings (YYYY-MM-DD); None where no layout reads a value.
+    The layout that read the bank's last date is tried first, so a batch from one bank
+    costs one match per value.
+    """
+    cache_key = bank_key or ""
+    layout = _date_layouts.get(cache_key, 0)
+    order = [layout] + [i for i in range(len(DATE_LAYOUTS)) if i != layout]
+    results = []
+    for value in values:
+        date = None
+        if value:
+            date, index = _parse_date(value.strip(), order)
+            if index is not None and index != order[0] and index != MONTH_FIRST:
+                order = [index] + [i for i in order if i != index]
+                _date_layouts[cache_key] = index
+        results.append(date.isoformat() if date else None)
+    return results
+
+
+def normalize_fields(fields: Dict[str, Any], bank_key: str = None) -> Dict[str, Any]:
+    """
+    Typed copy of parsed fields (a dict or ParseResult, copied as the same type): amounts in paise
+    and dates in ISO form. Values that cannot be read (including "NOT_FOUND") become None; other keys
+    are kept as they are.
+    """
+    typed = fields.copy()
+    amounts = [key for key in AMOUNT_FIELDS if key in fields]
+    dates = [key for key in DATE_FIELDS if key in fields]
+    typed.update(zip(amounts, amounts_to_paise(fields[key] for key in amounts)))
+    typed.update(zip(dates, dates_to_iso((fields[key] for key in dates), bank_key)))
+    return typed
+
+
+def clear() -> None:
+    """Forgets the per-bank date layouts."""
+    _date_layouts.clear()
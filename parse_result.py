@@ -0,0 +1,125 @@
+import zlib
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, Mapping
+
+# Every key a parse result has a slot for, in output order; raw_text and any other key are stored separately
+FIELDS = ("bank_name", "status", "extraction_method", "statement_date", "payment_due_date", "total_due",
+          "min_payment", "card_last_4_digits", "confidence", "field_confidence", "llm_status", "llm_error", "llm_request", "reason")
+RAW_TEXT_LEVEL = 1
+
+_UNSET = object()
+
+
+class ParseResult(MutableMapping):
+    """
+    Result of parsing one statement, with a fixed slot per field instead of a per-result dict.
+    Behaves like the dict parse_statement used to return: result["total_due"], result.get(...),
+    items(), pop(), dict(result) and ** all work, and a field that was never set is absent.
+    Keys outside FIELDS (e.g. a caller's result["file"] = path) go to an overflow dict.
+    raw_text, when kept, is held zlib-compressed and only decoded when read.
+    Pickles as a plain tuple of values, so results cross process boundaries cheaply.
+    It is not a dict subclass, so json.dumps needs to_dict() (or dict(result)).
+    """
+
+    __slots__ = FIELDS + ("_raw_text", "_extra")
+
+    def __init__(self, fields: Mapping[str, Any] = None, **kwargs):
+        for key, value in dict(fields or {}, **kwargs).items():
+            self[key] = value
+
+    @property
+    def raw_text(self) -> str:
+        """The extracted statement text, decoded on each access; None when it was not kept."""
+        compressed = getattr(self, "_raw_text", None)
+        return zlib.decompress(compressed).decode("utf-8") if compressed is not None else None
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "raw_text":
+            if not hasattr(self, "_raw_text"):
+                raise KeyError(key)
+            return self.raw_text
+        if key not in FIELDS:
+            return getattr(self, "_extra", {})[key]
+        value = getattr(self, key, _UNSET)
+        if value is _UNSET:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key == "raw_text":
+            self._raw_text = zlib.compress(value.encode("utf-8"), RAW_TEXT_LEVEL)
+        elif key in FIELDS:
+            setattr(self, key, value)
+        elif hasattr(self, "_extra"):
+            self._extra[key] = value
+        else:
+            self._extra = {key: value}
+
+    def __delitem__(self, key: str) -> None:
+        if key in FIELDS or key == "raw_text":
+            attribute = "_raw_text" if key == "raw_text" else key
+            if not hasattr(self, attribute):
+                raise KeyError(key)
+            delattr(self, attribute)
+            return
+        extra = getattr(self, "_extra", {})
+        del extra[key]
+        if not extra:
+            del self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        for key in FIELDS:
+            if hasattr(self, key):
+                yield key
+        yield from getattr(self, "_extra", ())
+        if hasattr(self, "_raw_text"):
+            yield "raw_text"
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, key: object) -> bool:
+        # Avoids decoding raw_text just to test for it
+        if key == "raw_text":
+            return hasattr(self, "_raw_text")
+        if key in FIELDS:
+            return hasattr(self, key)
+        return key in getattr(self, "_extra", ())
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{key}={value!r}" for key, value in self.items() if key != "raw_text")
+        if hasattr(self, "_raw_text"):
+            fields += f", raw_text=<{len(self._raw_text)} bytes compressed>"
+        return f"ParseResult({fields})"
+
+    def __reduce__(self):
+        values = tuple(getattr(self, key, _UNSET) for key in FIELDS)
+        # Unset fields travel as None plus a bitmask, since the sentinel cannot be pickled
+        mask = sum(1 << i for i, value in enumerate(values) if value is not _UNSET)
+        return _restore, (tuple(None if value is _UNSET else value for value in values), mask,
+                          getattr(self, "_raw_text", None), getattr(self, "_extra", None))
+
+    def copy(self) -> "ParseResult":
+        """A shallow copy; the compressed raw_text is shared, not re-encoded."""
+        values, mask, raw_text, extra = self.__reduce__()[1]
+        return _restore(values, mask, raw_text, dict(extra) if extra else None)
+
+    def to_dict(self, include_raw_text: bool = True) -> Dict[str, Any]:
+        """A plain dict, e.g. for JSON; raw_text is decoded only when included."""
+        result = {key: getattr(self, key) for key in FIELDS if hasattr(self, key)}
+        result.update(getattr(self, "_extra", {}))
+        if include_raw_text and hasattr(self, "_raw_text"):
+            result["raw_text"] = self.raw_text
+        return result
+
+
+def _restore(values: tuple, mask: int, raw_text: bytes, extra: Dict[str, Any] = None) -> ParseResult:
+    result = ParseResult()
+    for i, (key, value) in enumerate(zip(FIELDS, values)):
+        if mask & (1 << i):
+            setattr(result, key, value)
+    if raw_text is not None:
+        result._raw_text = raw_text
+    if extra:
+        result._extra = extra
+    return result
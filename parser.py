@@ -1,77 +1,248 @@
-import pdfplumber
 import re
 import io
+import time
 import json
 import os
-import requests
-from typing import Dict, Any, List
+import sys
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from functools import cached_property
+from typing import (TYPE_CHECKING, BinaryIO, Dict, Any, List, Callable, Iterable, Iterator, MutableMapping,
+                    Pattern, Tuple)
 from regex_patterns import REGEX_TEMPLATES
+import pattern_registry
+import pattern_profiler
+import normalize
+import pdf_backends
+import validation
+from pdf_input import PdfSource, open_pdf
+from parse_result import ParseResult
+from pattern_registry import (get_patterns, get_field_matcher, get_anchored_matcher, build_anchor_index,
+                              get_label_pattern, get_identifier_pattern, TemplateError)
+from pattern_profiler import PatternProfiler
+from result_cache import ResultCache, hash_pdf, hash_text
+from llm_client import GeminiClient, get_default_client
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
 
 GEMINI_MODEL = "gemini-2.5-flash-preview-05-20"
 API_URL_TEMPLATE = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent?key="
 
-def extract_text_from_pdf(pdf_file: io.BytesIO) -> str:
-    """Extracts text from all pages of the PDF file."""
+# Patterns used by the special extractors, compiled once at import
+NUMERIC_VALUE_RE = re.compile(r'^\d+\.?\d*$')
+WHITESPACE_RE = re.compile(r'[\s\n]+')
+HDFC_TOTAL_DUES_RE = re.compile(r"Total\s+Dues[\s\S]{0,100}?([\d,]+\.[\d]{2})", re.IGNORECASE)
+HDFC_ACCOUNT_SUMMARY_RE = re.compile(r"Account\s+Summary[\s\S]{1,500}?Total\s+Dues[\s\S]{0,100}?([\d,]+\.[\d]{2})", re.IGNORECASE)
+IDFC_SUMMARY_RE = re.compile(r"Statement\s+Summary[\s\S]{1,500}?Total\s+Amount\s+Due[\s\S]{0,100}?`?\s*([\d,]+\.[\d]{2})", re.IGNORECASE | re.DOTALL)
+IDFC_MIN_DUE_RE = re.compile(r"Minimum\s+Amount\s+Due[\s\S]{0,100}?`?\s*([\d,]+\.[\d]{2})", re.IGNORECASE)
+IDFC_PAYMENT_SECTION_RE = re.compile(r"Payment\s+Due\s+Date[\s\S]{0,200}?Total\s+Amount\s+Due[\s\S]{0,50}?`?\s*([\d,]+\.[\d]{2})[\s\S]{0,100}?Minimum\s+Amount\s+Due[\s\S]{0,50}?`?\s*([\d,]+\.[\d]{2})", re.IGNORECASE | re.DOTALL)
+IDFC_TOTAL_STANDALONE_RE = re.compile(r"Total\s+Amount\s+Due\s*\n?\s*`?\s*([\d,]+\.[\d]{2})\s*(?:CR|Dr)?", re.IGNORECASE)
+IDFC_MIN_STANDALONE_RE = re.compile(r"Minimum\s+Amount\s+Due\s*\n?\s*`?\s*([\d,]+\.[\d]{2})", re.IGNORECASE)
+LINE_BREAKS_RE = re.compile(r'[\r\n]+')
+
+# Pipeline stages reported to on_stage callbacks, in order
+STAGES = ["text_extraction", "bank_identification", "regex", "llm_fallback"]
+StageCallback = Callable[[str], None]
+
+KEYS_TO_SEARCH = ["statement_date", "payment_due_date", "total_due", "min_payment", "card_last_4_digits"]
+# The LLM fallback runs when one of these fields scores below LLM_CONFIDENCE_THRESHOLD
+# (see validation.score_fields); a field that was not found scores 0
+FALLBACK_KEYS = ["total_due", "payment_due_date", "min_payment"]
+LLM_CONFIDENCE_THRESHOLD = float(os.environ.get("PARSER_LLM_CONFIDENCE", 0.6))
+
+# Bank identification looks at this many leading characters (about a page) first;
+# an identifier hit counts half as much once it is IDENTIFIER_DECAY_CHARS from the top
+HEADER_CHARS = 3000
+IDENTIFIER_DECAY_CHARS = 200
+
+# Character budget for the text sent to the LLM fallback, and the window kept around each label
+LLM_CONTEXT_CHARS = 2000
+LLM_WINDOW_BEFORE = 60
+LLM_WINDOW_AFTER = 200
+
+# PDF text backend for every statement; unset lets each bank's template choose (see select_pdf_backend)
+PDF_BACKEND = os.environ.get("PARSER_PDF_BACKEND") or None
+# Backend used to read the first page when choosing per template
+PROBE_BACKEND = "textstream"
+
+# Full extraction splits a document's pages across this many processes (unset or 1 means sequential),
+# but only for documents with at least PARALLEL_MIN_PAGES pages
+PAGE_WORKERS = int(os.environ["PARSER_PAGE_WORKERS"]) if os.environ.get("PARSER_PAGE_WORKERS") else None
+PARALLEL_MIN_PAGES = int(os.environ.get("PARSER_PARALLEL_MIN_PAGES", 50))
+# Page ranges per worker, so one slow range does not hold up the whole document
+CHUNKS_PER_WORKER = 2
+
+# Streaming mode carries this much text from earlier pages so a match can span a page break,
+# and keeps the first STREAM_HEAD_CHARS as raw_text and LLM context
+STREAM_OVERLAP_CHARS = 4000
+STREAM_HEAD_CHARS = 8000
+# Streaming fails a document once the process RSS exceeds this many MB; unset means no ceiling
+MEMORY_LIMIT_MB = float(os.environ["PARSER_MEMORY_LIMIT_MB"]) if os.environ.get("PARSER_MEMORY_LIMIT_MB") else None
+
+def iter_pdf_pages(pdf_file: io.BytesIO, backend: str = None, pages: Iterable[int] = None) -> Iterator[str]:
+    """
+    Yields the cleaned text of each PDF page, opening pages only as they are consumed.
+    backend names one of pdf_backends.BACKENDS (default pdfplumber); pages limits extraction
+    to those zero-based page numbers.
+    """
     try:
-        with pdfplumber.open(pdf_file) as pdf:
-            full_text = ""
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    cleaned_text = re.sub(r'[\r\n]+', '\n', text)
-                    full_text += cleaned_text + "\n"
-            return full_text
+        for text in pdf_backends.iter_pages(pdf_file, backend, pages):
+            yield LINE_BREAKS_RE.sub('\n', text) + "\n" if text else ""
     except Exception as e:
         print(f"Error during PDF text extraction: {e}")
-        return ""
+
+@contextmanager
+def _pdf_path(pdf_file: BinaryIO) -> Iterator[str]:
+    """
+    A path the page workers can open the PDF from, so it is not pickled into every task. A file on
+    disk is used as it is (each worker maps it itself); anything else is written once to a
+    temporary file, removed when the document is done.
+    """
+    path = getattr(pdf_file, "name", None)
+    if isinstance(path, str) and os.path.isfile(path):
+        yield path
+        return
+
+    import tempfile
+
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf_file.getbuffer() if hasattr(pdf_file, "getbuffer") else pdf_file.read())
+        yield path
+    finally:
+        os.unlink(path)
+
+def _extract_page_range(path: str, backend: str, start: int, stop: int) -> List[str]:
+    """Page-pool task: the cleaned text of pages start..stop-1."""
+    with open_pdf(path) as pdf:
+        return list(iter_pdf_pages(pdf, backend, range(start, stop)))
+
+_page_pool = None
+_page_pool_workers = 0
+
+def get_page_pool(workers: int) -> "ProcessPoolExecutor":
+    """Process pool for page-parallel extraction, started on first use and reused across documents."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    global _page_pool, _page_pool_workers
+    if _page_pool is None or _page_pool_workers != workers:
+        if _page_pool is not None:
+            _page_pool.shutdown(wait=False)
+        _page_pool = ProcessPoolExecutor(max_workers=workers)
+        _page_pool_workers = workers
+    return _page_pool
+
+def _reset_page_pool() -> None:
+    """Drops a broken page pool; the next get_page_pool starts a fresh one."""
+    global _page_pool
+    if _page_pool is not None:
+        _page_pool.shutdown(wait=False)
+        _page_pool = None
+
+def _read_in_pool(path: str, backend: str, workers: int, page_count: int) -> List[str]:
+    chunk = -(-page_count // (workers * CHUNKS_PER_WORKER))
+    pool = get_page_pool(workers)
+    futures = [pool.submit(_extract_page_range, path, backend, start, min(start + chunk, page_count))
+               for start in range(0, page_count, chunk)]
+    return [text for future in futures for text in future.result()]
+
+def read_pdf_pages(pdf_file: io.BytesIO, backend: str = None, workers: int = None) -> List[str]:
+    """
+    Extracts the cleaned text of every page. With more than one worker (default PAGE_WORKERS) and
+    at least PARALLEL_MIN_PAGES pages, contiguous page ranges are extracted in a process pool and
+    reassembled in page order; smaller documents are read sequentially.
+    If a page worker dies, the pool is replaced and the document tried once more in the new one;
+    a second death raises BrokenProcessPool, leaving a fresh pool for the next document.
+    """
+    workers = workers if workers is not None else PAGE_WORKERS
+    page_count = 0
+    if workers and workers > 1:
+        page_count = pdf_backends.count_pages(pdf_file)
+        pdf_file.seek(0)
+    if page_count < max(PARALLEL_MIN_PAGES, 2):
+        return list(iter_pdf_pages(pdf_file, backend))
+
+    with _pdf_path(pdf_file) as path:
+        pdf_file.seek(0)
+        try:
+            return _read_in_pool(path, backend, workers, page_count)
+        except BrokenProcessPool:
+            _reset_page_pool()
+        try:
+            return _read_in_pool(path, backend, workers, page_count)
+        except BrokenProcessPool:
+            _reset_page_pool()
+            raise
+
+def extract_text_from_pdf(pdf_file: io.BytesIO, backend: str = None, workers: int = None) -> str:
+    """Extracts text from all pages of the PDF file (in parallel for large documents, see read_pdf_pages)."""
+    return "".join(read_pdf_pages(pdf_file, backend, workers))
+
+def select_pdf_backend(pdf_file: io.BytesIO) -> str:
+    """
+    Returns PDF_BACKEND when set. Otherwise, if any template declares a "backend", reads the first
+    page with the fast PROBE_BACKEND, identifies the bank and returns the backend its template is
+    validated against (pdfplumber when it declares none). The file is rewound afterwards.
+    """
+    if PDF_BACKEND:
+        return PDF_BACKEND
+    if all("backend" not in template for template in REGEX_TEMPLATES.values()):
+        return pdf_backends.DEFAULT_BACKEND
+
+    pages = iter_pdf_pages(pdf_file, PROBE_BACKEND)
+    first_page = next(pages, "")
+    pages.close()
+    pdf_file.seek(0)
+    bank_key = identify_bank(first_page)
+    backend = REGEX_TEMPLATES.get(bank_key, {}).get("backend", pdf_backends.DEFAULT_BACKEND)
+    if backend not in pdf_backends.BACKENDS:
+        raise TemplateError(f"Unknown PDF backend '{backend}' in template {bank_key}")
+    return backend
+
+def identify_bank_with_confidence(text: str, header_chars: int = HEADER_CHARS) -> Tuple[str, float]:
+    """
+    Identifies the bank with one scan over the header region using all identifiers at once.
+    Each hit scores by identifier length, weighted down the further it is from the top,
+    so a bank named in a transaction line does not beat the issuer in the header.
+    Scans the rest of the text only if the header has no identifier.
+    Returns the bank key and its share of the total score (0.0 when unknown).
+    """
+    pattern, owners = get_identifier_pattern()
+    scores = {}
+    for region in (text[:header_chars], text):
+        for match in pattern.finditer(region):
+            # By group, not by the matched text: case-insensitive matching also accepts
+            # Unicode look-alikes (e.g. the Kelvin sign for K) that upper() does not fold back
+            bank_key = owners[match.lastgroup]
+            weight = len(match.group()) / (1.0 + match.start() / IDENTIFIER_DECAY_CHARS)
+            scores[bank_key] = scores.get(bank_key, 0.0) + weight
+        if scores or len(text) <= header_chars:
+            break
+
+    if not scores:
+        return "unknown", 0.0
+    bank_key = max(scores, key=scores.get)
+    return bank_key, scores[bank_key] / sum(scores.values())
 
 def identify_bank(text: str) -> str:
     """Identifies the bank based on keywords found in the text."""
-    clean_text = text.upper().replace('\n', ' ')
-    for bank_key, template in REGEX_TEMPLATES.items():
-        identifiers_to_check = [i.upper() for i in template.get("identifier", [])]
-        for identifier in identifiers_to_check:
-            if identifier in clean_text:
-                return bank_key
-    return "unknown"
+    return identify_bank_with_confidence(text)[0]
 
 def clean_amount(value: str) -> str:
     """
     Clean and normalize amount values.
-    Handles formats like: 22,935.00, 22935.00, 22.935,00, etc.
+    Handles formats like: 22,935.00, Rs. 22935.00 Dr, ` 22,935.00 Cr, etc.
+    Kept for string output; normalize.amounts_to_paise and friends give typed batches.
     """
-    if not value:
-        return value
-    
-    # Remove currency symbols and DR/Cr/CR indicators
-    value = value.replace('$', '').replace('£', '').replace('₹', '').replace('Rs', '').replace('`', '').strip()
-    value = value.replace('DR', '').replace('Cr', '').replace('CR', '').replace('dr', '').replace('cr', '').strip()
-    
-    # Remove any spaces
-    value = value.replace(' ', '')
-    
-    # Handle Indian number format (commas for thousands)
-    if ',' in value and '.' in value:
-        value = value.replace(',', '')
-    elif ',' in value:
-        value = value.replace(',', '')
-    
-    # Keep only digits and decimal point
-    value = re.sub(r'[^\d.]', '', value)
-    
-    # Handle multiple decimal points (keep only the last one)
-    if value.count('.') > 1:
-        parts = value.split('.')
-        value = ''.join(parts[:-1]) + '.' + parts[-1]
-    
-    return value.strip()
+    return normalize.clean_amount(value)
 
 def extract_hdfc_total_dues(text: str) -> str:
     """
     Special extraction logic for HDFC Total Dues from Account Summary table.
     """
-    pattern = r"Total\s+Dues[\s\S]{0,100}?([\d,]+\.[\d]{2})"
-    matches = re.findall(pattern, text, re.IGNORECASE)
+    matches = HDFC_TOTAL_DUES_RE.findall(text)
     
     valid_amounts = []
     for match in matches:
@@ -87,8 +258,7 @@ def extract_hdfc_total_dues(text: str) -> str:
         valid_amounts.sort(reverse=True)
         return valid_amounts[0][1]
     
-    account_summary_pattern = r"Account\s+Summary[\s\S]{1,500}?Total\s+Dues[\s\S]{0,100}?([\d,]+\.[\d]{2})"
-    match = re.search(account_summary_pattern, text, re.IGNORECASE)
+    match = HDFC_ACCOUNT_SUMMARY_RE.search(text)
     if match:
         amount = match.group(1)
         if float(clean_amount(amount)) > 0:
@@ -104,23 +274,20 @@ def extract_idfc_amounts(text: str) -> Dict[str, str]:
     result = {"total_due": None, "min_payment": None}
     
     # Strategy 1: Look for amounts in Statement Summary section
-    summary_pattern = r"Statement\s+Summary[\s\S]{1,500}?Total\s+Amount\s+Due[\s\S]{0,100}?`?\s*([\d,]+\.[\d]{2})"
-    match = re.search(summary_pattern, text, re.IGNORECASE | re.DOTALL)
+    match = IDFC_SUMMARY_RE.search(text)
     
     if match:
         result["total_due"] = match.group(1)
     
     # Strategy 2: Look for minimum amount due near total amount due
     if result["total_due"]:
-        min_pattern = r"Minimum\s+Amount\s+Due[\s\S]{0,100}?`?\s*([\d,]+\.[\d]{2})"
-        min_match = re.search(min_pattern, text, re.IGNORECASE)
+        min_match = IDFC_MIN_DUE_RE.search(text)
         if min_match:
             result["min_payment"] = min_match.group(1)
     
     # Strategy 3: Look for both amounts in payment information section
     if not result["total_due"] or not result["min_payment"]:
-        payment_section_pattern = r"Payment\s+Due\s+Date[\s\S]{0,200}?Total\s+Amount\s+Due[\s\S]{0,50}?`?\s*([\d,]+\.[\d]{2})[\s\S]{0,100}?Minimum\s+Amount\s+Due[\s\S]{0,50}?`?\s*([\d,]+\.[\d]{2})"
-        payment_match = re.search(payment_section_pattern, text, re.IGNORECASE | re.DOTALL)
+        payment_match = IDFC_PAYMENT_SECTION_RE.search(text)
         
         if payment_match:
             if not result["total_due"]:
@@ -130,7 +297,7 @@ def extract_idfc_amounts(text: str) -> Dict[str, str]:
     
     # Strategy 4: Look for standalone amounts with CR/Dr suffix
     if not result["total_due"]:
-        total_standalone = re.search(r"Total\s+Amount\s+Due\s*\n?\s*`?\s*([\d,]+\.[\d]{2})\s*(?:CR|Dr)?", text, re.IGNORECASE)
+        total_standalone = IDFC_TOTAL_STANDALONE_RE.search(text)
         if total_standalone:
             amount = total_standalone.group(1)
             try:
@@ -140,37 +307,156 @@ def extract_idfc_amounts(text: str) -> Dict[str, str]:
                 pass
     
     if not result["min_payment"]:
-        min_standalone = re.search(r"Minimum\s+Amount\s+Due\s*\n?\s*`?\s*([\d,]+\.[\d]{2})", text, re.IGNORECASE)
+        min_standalone = IDFC_MIN_STANDALONE_RE.search(text)
         if min_standalone:
             result["min_payment"] = min_standalone.group(1)
     
     return result
 
-def extract_with_llm(full_text: str, api_key: str) -> Dict[str, Any]:
-    """Uses Gemini LLM to extract structured data as a fallback."""
-    if not api_key or api_key == "GEMINI_API_KEY":
-        return {"llm_status": "SKIPPED", "reason": "Gemini API Key is missing or placeholder."}
+class DocumentContext:
+    """
+    One statement's text and the views the pipeline derives from it. Each view is computed on
+    first use and kept, so no stage re-derives a string or reruns a special extractor for the
+    same document (e.g. extract_idfc_amounts serves both total_due and min_payment).
+    """
 
+    def __init__(self, pages: List[str]):
+        self.pages = pages
+        self._anchors: Dict[str, Dict[str, List[int]]] = {}
+
+    @cached_property
+    def text(self) -> str:
+        return "".join(self.pages)
+
+    @cached_property
+    def lowered(self) -> str:
+        return self.text.lower()
+
+    @cached_property
+    def bank(self) -> Tuple[str, float]:
+        """The (bank key, confidence) pair from identify_bank_with_confidence."""
+        return identify_bank_with_confidence(self.text)
+
+    @cached_property
+    def hdfc_total_dues(self) -> str:
+        return extract_hdfc_total_dues(self.text)
+
+    @cached_property
+    def idfc_amounts(self) -> Dict[str, str]:
+        return extract_idfc_amounts(self.text)
+
+    def anchors(self, bank_key: str) -> Dict[str, List[int]]:
+        """Label positions for a bank's patterns (see pattern_registry.build_anchor_index)."""
+        anchors = self._anchors.get(bank_key)
+        if anchors is None:
+            anchors = self._anchors[bank_key] = build_anchor_index(self.text, bank_key, self.lowered)
+        return anchors
+
+def build_llm_context(full_text: str, fields: List[str], max_chars: int = LLM_CONTEXT_CHARS) -> str:
+    """
+    Cuts the statement down to text windows around the labels of the requested fields.
+    Windows are taken round-robin across fields so each field is represented,
+    merged where they overlap and kept in document order within the character budget.
+    Falls back to the start of the statement when no label is found.
+    """
+    if max_chars is None or len(full_text) <= max_chars:
+        return full_text
+
+    per_field = [
+        [(max(0, m.start() - LLM_WINDOW_BEFORE), min(len(full_text), m.end() + LLM_WINDOW_AFTER))
+         for m in get_label_pattern(field).finditer(full_text)]
+        for field in fields
+    ]
+
+    selected = []
+    used = 0
+    for rank in range(max((len(w) for w in per_field), default=0)):
+        for windows in per_field:
+            if rank < len(windows) and used < max_chars:
+                start, end = windows[rank]
+                end = min(end, start + max_chars - used)
+                selected.append((start, end))
+                used += end - start
+
+    if not selected:
+        return full_text[:max_chars]
+
+    selected.sort()
+    merged = [list(selected[0])]
+    for start, end in selected[1:]:
+        if start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return "\n...\n".join(full_text[start:end] for start, end in merged)
+
+LLM_RULES = (
+    "Use only data from the text; if missing, return 'NOT_FOUND'. "
+    "For total_due, find the 'Total Amount Due' or 'Total Dues' value, NOT zero values. "
+    "Remove DR, Cr, or CR suffixes from amounts."
+)
+
+def build_llm_payload(full_text: str, fields: List[str] = None, max_chars: int = LLM_CONTEXT_CHARS) -> Dict[str, Any]:
+    """Builds the Gemini generateContent request, asking only for the given fields."""
+    fields = fields or KEYS_TO_SEARCH
     response_schema = {
         "type": "OBJECT",
-        "properties": {
-            "statement_date": {"type": "STRING"},
-            "payment_due_date": {"type": "STRING"},
-            "total_due": {"type": "STRING"},
-            "min_payment": {"type": "STRING"},
-            "card_last_4_digits": {"type": "STRING"},
+        "properties": {field: {"type": "STRING"} for field in fields},
+    }
+
+    system_prompt = (
+        f"You are an expert financial data extractor. Extract these fields: {', '.join(fields)} "
+        "into strict JSON. " + LLM_RULES
+    )
+    context = build_llm_context(full_text, fields, max_chars)
+    user_query = f"Extract data from the statement excerpts:\n---\n{context}\n---"
+
+    return {
+        "contents": [{"parts": [{"text": user_query}]}],
+        "systemInstruction": {"parts": [{"text": system_prompt}]},
+        "generationConfig": {
+            "responseMimeType": "application/json",
+            "responseSchema": response_schema,
+            "temperature": 0.0
+        },
+    }
+
+def parse_llm_response(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Turns a Gemini response into extracted fields plus llm_status."""
+    if result.get('candidates'):
+        json_text = result['candidates'][0]['content']['parts'][0]['text']
+        llm_extracted_data = json.loads(json_text)
+        llm_extracted_data["llm_status"] = "SUCCESS"
+        return llm_extracted_data
+
+    return {"llm_status": "FAILED", "reason": "Empty or malformed LLM response."}
+
+def build_batch_llm_payload(jobs: List[Tuple[str, List[str], str]]) -> Dict[str, Any]:
+    """
+    Builds one generateContent request for several statements. jobs are (document ID, fields, context)
+    triples, with context already cut by build_llm_context; the answer is an array holding one object
+    per document, keyed by its document_id.
+    """
+    fields = [key for key in KEYS_TO_SEARCH if any(key in job_fields for _, job_fields, _ in jobs)]
+    response_schema = {
+        "type": "ARRAY",
+        "items": {
+            "type": "OBJECT",
+            "properties": dict({"document_id": {"type": "STRING"}}, **{field: {"type": "STRING"} for field in fields}),
+            "required": ["document_id"],
         },
     }
 
     system_prompt = (
-        "You are an expert financial data extractor. Extract five specific fields "
-        "into strict JSON. Use only data from the text; if missing, return 'NOT_FOUND'. "
-        "For total_due, find the 'Total Amount Due' or 'Total Dues' value, NOT zero values. "
-        "Remove DR, Cr, or CR suffixes from amounts."
+        "You are an expert financial data extractor. Each document below is one statement and names "
+        "the fields to extract from it. Return a JSON array with one object per document, holding its "
+        "document_id and only the fields named for it. " + LLM_RULES
     )
-    user_query = f"Extract data from the statement text:\n---\n{full_text}\n---"
+    user_query = "Extract data from the statement excerpts of each document:\n" + "".join(
+        f"\n=== document_id: {document_id} | fields: {', '.join(job_fields)} ===\n{context}\n"
+        for document_id, job_fields, context in jobs)
 
-    payload = {
+    return {
         "contents": [{"parts": [{"text": user_query}]}],
         "systemInstruction": {"parts": [{"text": system_prompt}]},
         "generationConfig": {
@@ -180,38 +466,438 @@ def extract_with_llm(full_text: str, api_key: str) -> Dict[str, Any]:
         },
     }
 
-    try:
-        api_url = API_URL_TEMPLATE + api_key
-        response = requests.post(api_url, headers={'Content-Type': 'application/json'}, json=payload)
-        response.raise_for_status()
-        result = response.json()
+def parse_batch_llm_response(result: Dict[str, Any], jobs: List[Tuple[str, List[str], str]]) -> Dict[str, Dict[str, Any]]:
+    """Splits a batched Gemini response into extract_with_llm-style results per document ID."""
+    if not result.get('candidates'):
+        answers = {}
+    else:
+        items = json.loads(result['candidates'][0]['content']['parts'][0]['text'])
+        answers = {str(item.get("document_id")): item for item in items if isinstance(item, dict)}
+
+    results = {}
+    for document_id, fields, _ in jobs:
+        answer = answers.get(document_id)
+        if answer is None:
+            results[document_id] = {"llm_status": "FAILED", "reason": "No answer for this document in the batched LLM response."}
+        else:
+            results[document_id] = dict({key: answer[key] for key in fields if key in answer}, llm_status="SUCCESS")
+    return results
 
-        if result.get('candidates'):
-            json_text = result['candidates'][0]['content']['parts'][0]['text']
-            llm_extracted_data = json.loads(json_text)
-            llm_extracted_data["llm_status"] = "SUCCESS"
-            return llm_extracted_data
+def extract_with_llm(full_text: str, api_key: str, client: GeminiClient = None, fields: List[str] = None,
+                     max_chars: int = LLM_CONTEXT_CHARS) -> Dict[str, Any]:
+    """
+    Uses Gemini LLM to extract structured data as a fallback.
+    Only the given fields (default: all) are requested, from text windows within max_chars.
+    """
+    if not api_key or api_key == "GEMINI_API_KEY":
+        return {"llm_status": "SKIPPED", "reason": "Gemini API Key is missing or placeholder."}
 
-        return {"llm_status": "FAILED", "reason": "Empty or malformed LLM response."}
+    import requests
+    client = client or get_default_client()
+    try:
+        result = client.post_json(API_URL_TEMPLATE + api_key, build_llm_payload(full_text, fields, max_chars))
+        return parse_llm_response(result)
 
     except requests.exceptions.HTTPError as err:
         return {"llm_status": "FAILED", "reason": f"HTTP Error: {err}"}
+    except requests.exceptions.Timeout as err:
+        return {"llm_status": "FAILED", "reason": f"Request timed out: {err}"}
+    except Exception as e:
+        return {"llm_status": "FAILED", "reason": f"Error processing LLM response: {e}"}
+
+def extract_batch_with_llm(jobs: List[Tuple[str, List[str], str]], api_key: str,
+                           client: GeminiClient = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Batched extract_with_llm: one Gemini request for several statements (see build_batch_llm_payload).
+    Returns each document ID's result; a failed request fails every document in it.
+    """
+    if not api_key or api_key == "GEMINI_API_KEY":
+        failure = {"llm_status": "SKIPPED", "reason": "Gemini API Key is missing or placeholder."}
+    else:
+        import requests
+        client = client or get_default_client()
+        try:
+            result = client.post_json(API_URL_TEMPLATE + api_key, build_batch_llm_payload(jobs))
+            return parse_batch_llm_response(result, jobs)
+
+        except requests.exceptions.HTTPError as err:
+            failure = {"llm_status": "FAILED", "reason": f"HTTP Error: {err}"}
+        except requests.exceptions.Timeout as err:
+            failure = {"llm_status": "FAILED", "reason": f"Request timed out: {err}"}
+        except Exception as e:
+            failure = {"llm_status": "FAILED", "reason": f"Error processing LLM response: {e}"}
+    return {document_id: dict(failure) for document_id, _, _ in jobs}
+
+async def aextract_with_llm(full_text: str, api_key: str, client: GeminiClient = None, fields: List[str] = None,
+                            max_chars: int = LLM_CONTEXT_CHARS) -> Dict[str, Any]:
+    """Async variant of extract_with_llm, so many fallback calls can overlap on one event loop."""
+    if not api_key or api_key == "GEMINI_API_KEY":
+        return {"llm_status": "SKIPPED", "reason": "Gemini API Key is missing or placeholder."}
+
+    import asyncio
+    client = client or get_default_client()
+    try:
+        result = await client.apost_json(API_URL_TEMPLATE + api_key, build_llm_payload(full_text, fields, max_chars))
+        return parse_llm_response(result)
+
+    except asyncio.TimeoutError:
+        return {"llm_status": "FAILED", "reason": "Request timed out."}
     except Exception as e:
         return {"llm_status": "FAILED", "reason": f"Error processing LLM response: {e}"}
 
-def parse_statement(pdf_file: io.BytesIO, api_key: str = None) -> Dict[str, Any]:
-    """Main function: parses PDF with RegEx, falls back to LLM if needed."""
-    full_text = extract_text_from_pdf(pdf_file)
+def _validate_value(key: str, value: str) -> str:
+    """Cleans a matched value; returns None when the zero/format checks reject it."""
+    value = value.strip()
+    if key in ["total_due", "min_payment"]:
+        value = clean_amount(value)
+        if not value or not NUMERIC_VALUE_RE.match(value):
+            return None
+        if key == "total_due" and float(value) == 0:
+            return None
+    value = WHITESPACE_RE.sub(' ', value).strip()
+    return value or None
+
+def _match_sequential(text: str, bank_key: str, key: str, patterns: List[Pattern],
+                      profiler: PatternProfiler = None) -> str:
+    """Tries the field's patterns one search at a time, in order; the first valid value wins."""
+    for index, pattern in enumerate(patterns):
+        if pattern_registry.disabled and (bank_key, key, index) in pattern_registry.disabled:
+            continue
+        started = time.perf_counter()
+        match = pattern.search(text)
+        elapsed = time.perf_counter() - started
+        if elapsed > pattern_registry.PATTERN_BUDGET_SECONDS:
+            pattern_registry.record_overrun(bank_key, key, index, elapsed)
+
+        value = _validate_value(key, match.group(1)) if match else None
+        if profiler:
+            profiler.record(bank_key, key, index, match is not None, match is not None and not value, elapsed)
+        if value:
+            return value
+    return None
+
+def _time_patterns(text: str, bank_key: str, key: str) -> None:
+    """
+    Searches each enabled pattern of a field on its own, recording those over the budget; run when a
+    combined scan overran without any single pattern to blame (its alternations are timed as a whole).
+    """
+    for index, pattern in enumerate(get_patterns(bank_key).get(key, [])):
+        if (bank_key, key, index) in pattern_registry.disabled:
+            continue
+        started = time.perf_counter()
+        pattern.search(text)
+        elapsed = time.perf_counter() - started
+        if elapsed > pattern_registry.PATTERN_BUDGET_SECONDS:
+            pattern_registry.record_overrun(bank_key, key, index, elapsed)
+
+def _match_candidates(candidates: Iterator[Tuple[int, str]], text: str, bank_key: str, key: str, strategy: str,
+                      profiler: PatternProfiler, attempts: Dict[int, float]) -> str:
+    """
+    Validates (pattern index, value) candidates in priority order; the first valid value wins,
+    as in _match_sequential. attempts is the dict the matcher filled with the seconds spent on each
+    pattern it tried (see FieldMatcher): a pattern over the budget counts an overrun, as in the
+    sequential loop, and the profiler gets one attempt per pattern, plus the whole scan time
+    under the strategy name.
+    """
+    started = time.perf_counter()
+    value = None
+    rejected = {}
+    for index, raw_value in candidates:
+        value = _validate_value(key, raw_value)
+        rejected[index] = not value
+        if value:
+            break
+    elapsed = time.perf_counter() - started
+    budget = pattern_registry.PATTERN_BUDGET_SECONDS
+    over = {index: seconds for index, seconds in attempts.items() if seconds > budget}
+    for index, seconds in sorted(over.items()):
+        pattern_registry.record_overrun(bank_key, key, index, seconds)
+    if elapsed > budget:
+        pattern_registry.record_overrun(bank_key, key, strategy, elapsed)
+        if not over and strategy == "combined":
+            _time_patterns(text, bank_key, key)
+    if profiler:
+        for index, seconds in sorted(attempts.items()):
+            profiler.record(bank_key, key, index, index in rejected, rejected.get(index, False), seconds)
+        profiler.record(bank_key, key, strategy, value is not None, False, elapsed)
+    return value
+
+def extract_fields(text: str, bank_key: str, keys: Iterable[str] = KEYS_TO_SEARCH,
+                   context: DocumentContext = None) -> Dict[str, str]:
+    """
+    Runs the bank's RegEx patterns on the text and returns the fields that were found.
+    A context for the same text shares its cached views with the other stages.
+    """
+    patterns = get_patterns(bank_key)
+    profiler = pattern_profiler.active
+    strategy = pattern_registry.get_strategy()
+    context = context or DocumentContext([text])
+    found = {}
+
+    for key in keys:
+        # Special handling for HDFC Total Dues
+        if bank_key == "hdfc" and key == "total_due":
+            started = time.perf_counter()
+            hdfc_amount = context.hdfc_total_dues
+            if profiler:
+                profiler.record(bank_key, key, "hdfc_total_dues", bool(hdfc_amount), False, time.perf_counter() - started)
+            if hdfc_amount:
+                found[key] = clean_amount(hdfc_amount)
+                continue
+        
+        # Special handling for IDFC amounts
+        if bank_key == "idfc" and key in ["total_due", "min_payment"]:
+            started = time.perf_counter()
+            idfc_amounts = context.idfc_amounts
+            if profiler:
+                profiler.record(bank_key, key, "idfc_amounts", bool(idfc_amounts[key]), False, time.perf_counter() - started)
+            if idfc_amounts[key]:
+                found[key] = clean_amount(idfc_amounts[key])
+                continue
+        
+        # Per-pattern seconds, for the budget and the profiler
+        attempts = {}
+        if strategy == "anchored":
+            candidates = get_anchored_matcher(bank_key, key).candidates(text, context.anchors(bank_key), attempts)
+            value = _match_candidates(candidates, text, bank_key, key, strategy, profiler, attempts)
+        elif strategy == "combined":
+            candidates = get_field_matcher(bank_key, key).candidates(text, attempts)
+            value = _match_candidates(candidates, text, bank_key, key, strategy, profiler, attempts)
+        else:
+            value = _match_sequential(text, bank_key, key, patterns.get(key, []), profiler)
+        if value:
+            found[key] = value
+
+    return found
+
+def iter_field_candidates(text: str, bank_key: str, key: str, context: DocumentContext = None) -> Iterator[str]:
+    """
+    Every valid value the bank's extractors find for a field, in the order extract_fields ranks them:
+    the special extractor's value, then each pattern's matches in pattern order. Duplicates are skipped.
+    Used to re-pick a field that fails validation, so it is not profiled.
+    """
+    context = context or DocumentContext([text])
+    seen = set()
+    special = None
+    if bank_key == "hdfc" and key == "total_due":
+        special = context.hdfc_total_dues
+    elif bank_key == "idfc" and key in ["total_due", "min_payment"]:
+        special = context.idfc_amounts[key]
+    if special:
+        value = clean_amount(special)
+        seen.add(value)
+        yield value
+
+    for index, pattern in enumerate(get_patterns(bank_key).get(key, [])):
+        if pattern_registry.disabled and (bank_key, key, index) in pattern_registry.disabled:
+            continue
+        for match in pattern.finditer(text):
+            value = _validate_value(key, match.group(1))
+            if value and value not in seen:
+                seen.add(value)
+                yield value
+
+def extract_incrementally(pdf_file: io.BytesIO, on_stage: StageCallback = None,
+                          backend: str = None) -> Tuple[str, str, Dict[str, str]]:
+    """
+    Extracts pages one at a time, running the bank's patterns on the text read so far.
+    Stops opening pages as soon as every field is resolved.
+    Returns the text read, the bank key and the fields found.
+    """
+    pages = []
+    context = DocumentContext(pages)
+    bank_key = "unknown"
+    found = {}
+
+    for page_text in iter_pdf_pages(pdf_file, backend):
+        pages.append(page_text)
+        # The text grew, so every view is derived afresh from the pages read so far
+        context = DocumentContext(pages)
+        if bank_key == "unknown":
+            if on_stage:
+                on_stage("bank_identification")
+            bank_key = context.bank[0]
+            if bank_key == "unknown":
+                continue
+
+        if on_stage:
+            on_stage("regex")
+        missing = [key for key in KEYS_TO_SEARCH if key not in found]
+        found.update(extract_fields(context.text, bank_key, missing, context))
+        if len(found) == len(KEYS_TO_SEARCH):
+            break
+
+    return context.text, bank_key, found
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB (the peak where the current value is unavailable), or None."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def extract_streaming(pdf_file: io.BytesIO, on_stage: StageCallback = None, overlap_chars: int = STREAM_OVERLAP_CHARS,
+                      memory_limit_mb: float = None, backend: str = None) -> Tuple[str, str, Dict[str, str]]:
+    """
+    Reads pages one at a time and matches on a rolling window of the current page plus the last
+    overlap_chars of earlier ones, so memory stays flat however long the statement is.
+    Stops once every field is resolved. Raises MemoryError when the process RSS goes over memory_limit_mb
+    (default MEMORY_LIMIT_MB). Returns the first STREAM_HEAD_CHARS of text, the bank key and the fields found.
+    """
+    memory_limit_mb = memory_limit_mb if memory_limit_mb is not None else MEMORY_LIMIT_MB
+    head = ""
+    tail = ""
+    bank_key = "unknown"
+    found = {}
+
+    for page_text in iter_pdf_pages(pdf_file, backend):
+        if len(head) < STREAM_HEAD_CHARS:
+            head += page_text[:STREAM_HEAD_CHARS - len(head)]
+        context = DocumentContext([tail, page_text])
+        if bank_key == "unknown":
+            if on_stage:
+                on_stage("bank_identification")
+            bank_key = context.bank[0]
+
+        if bank_key != "unknown":
+            if on_stage:
+                on_stage("regex")
+            missing = [key for key in KEYS_TO_SEARCH if key not in found]
+            found.update(extract_fields(context.text, bank_key, missing, context))
+            if len(found) == len(KEYS_TO_SEARCH):
+                break
+
+        tail = context.text[-overlap_chars:] if overlap_chars else ""
+        if memory_limit_mb:
+            rss = current_rss_mb()
+            if rss is not None and rss > memory_limit_mb:
+                raise MemoryError(f"Memory ceiling exceeded: {rss:.0f} MB used, limit {memory_limit_mb:.0f} MB")
+
+    return head, bank_key, found
+
+def parse_statement(pdf_file: PdfSource, api_key: str = None, incremental: bool = False,
+                    cache: ResultCache = None, on_stage: StageCallback = None,
+                    streaming: bool = False, keep_raw_text: bool = True, defer_llm: bool = False) -> ParseResult:
+    """
+    Main function: parses PDF with RegEx, falls back to LLM if needed.
+    pdf_file is a path (memory-mapped), a buffer such as bytes or memoryview (read in place)
+    or a binary file object; the PDF is not copied on its way to the PDF library or the cache hash.
+    With incremental=True, pages are read only until every field is found.
+    With streaming=True, pages are also read only until every field is found, but only a rolling
+    window of text is kept (see extract_streaming); raw_text and the LLM fallback get the first
+    STREAM_HEAD_CHARS of the statement.
+    Otherwise every page is read, in parallel for large documents when PAGE_WORKERS is set.
+    The PDF text backend comes from select_pdf_backend.
+    With a cache, results are looked up by PDF hash, then by extracted-text hash.
+    on_stage is called with the name of each pipeline stage (see STAGES) as it starts.
+    With keep_raw_text=False the result carries no raw_text; otherwise it is kept compressed.
+    With defer_llm=True the LLM fallback is not called: a result that needs it has llm_status "PENDING"
+    and an llm_request (fields and trimmed context) to answer in a batch and pass to complete_llm_request.
+    """
+    with open_pdf(pdf_file) as pdf:
+        return make_result(_parse_pdf(pdf, api_key, incremental, cache, on_stage, streaming, defer_llm),
+                           keep_raw_text)
+
+def _parse_pdf(pdf_file: BinaryIO, api_key: str, incremental: bool, cache: ResultCache,
+               on_stage: StageCallback, streaming: bool, defer_llm: bool = False) -> Dict[str, Any]:
+    mode = "streaming" if streaming else "incremental" if incremental else "full"
+    if cache is not None:
+        is_key_valid = api_key and api_key != "GEMINI_API_KEY"
+        variant = f"{mode}/{PDF_BACKEND or 'auto'}/{f'llm@{LLM_CONFIDENCE_THRESHOLD:g}' if is_key_valid else 'regex'}"
+        # Results found with patterns disabled are not the ones the full templates give
+        disabled = pattern_registry.disabled_fingerprint()
+        if disabled:
+            variant += f"/off:{disabled}"
+        pdf_key = cache.key("pdf", hash_pdf(pdf_file), GEMINI_MODEL, variant)
+        cached = cache.get(pdf_key)
+        if cached is not None:
+            return cached
+
+    if on_stage:
+        on_stage("text_extraction")
+    backend = select_pdf_backend(pdf_file)
+    context = None
+    if streaming:
+        try:
+            full_text, bank_key, found = extract_streaming(pdf_file, on_stage, backend=backend)
+        except MemoryError as e:
+            return {"status": "FAILED", "reason": str(e)}
+    elif incremental:
+        full_text, bank_key, found = extract_incrementally(pdf_file, on_stage, backend)
+    else:
+        context = DocumentContext(read_pdf_pages(pdf_file, backend))
+        full_text = context.text
+        if on_stage and full_text:
+            on_stage("bank_identification")
+        bank_key = context.bank[0] if full_text else "unknown"
+        found = None
+
+    if cache is None:
+        return _parse_text(full_text, api_key, bank_key, found, on_stage, context, defer_llm)
+
+    # A streamed statement keeps only its head, which does not identify the document
+    text_key = cache.key("text", hash_text(full_text), GEMINI_MODEL, variant) if full_text and not streaming else None
+    if text_key:
+        cached = cache.get(text_key)
+        if cached is not None:
+            cache.put(pdf_key, cached)
+            return cached
+
+    result = _parse_text(full_text, api_key, bank_key, found, on_stage, context, defer_llm)
+    if result.get("llm_status") == "PENDING":
+        # The caller caches the result under these keys once complete_llm_request has finished it
+        result["llm_request"]["cache_keys"] = [pdf_key, text_key] if text_key else [pdf_key]
+    # A failed LLM call is transient and must not be pinned in the cache, and a deferred one is not final
+    if result.get("llm_status") not in ("FAILED", "PENDING"):
+        cache.put(pdf_key, result)
+        if text_key:
+            cache.put(text_key, result)
+    return result
+
+def bank_key_for(result: Dict[str, Any]) -> str:
+    """The template key of a parse result's bank_name, or None."""
+    return next((key for key, template in REGEX_TEMPLATES.items()
+                 if template["identifier"][0] == result.get("bank_name")), None)
+
+def make_result(fields: Dict[str, Any], keep_raw_text: bool = True) -> ParseResult:
+    """Packs a result dict (as built by the pipeline and stored in the cache) into a ParseResult."""
+    if not keep_raw_text and "raw_text" in fields:
+        fields = {key: value for key, value in fields.items() if key != "raw_text"}
+    return ParseResult(fields)
+
+def parse_text(full_text: str, api_key: str = None, bank_key: str = None, found: Dict[str, str] = None,
+               on_stage: StageCallback = None, context: DocumentContext = None,
+               keep_raw_text: bool = True, defer_llm: bool = False) -> ParseResult:
+    """
+    Parses already-extracted statement text with RegEx, falls back to LLM if needed.
+    context, when given, holds views already derived from full_text.
+    defer_llm works as in parse_statement.
+    """
+    return make_result(_parse_text(full_text, api_key, bank_key, found, on_stage, context, defer_llm),
+                       keep_raw_text)
+
+def _parse_text(full_text: str, api_key: str, bank_key: str, found: Dict[str, str],
+                on_stage: StageCallback, context: DocumentContext, defer_llm: bool = False) -> Dict[str, Any]:
     if not full_text:
         return {"status": "FAILED", "reason": "Could not extract text from PDF."}
+    context = context or DocumentContext([full_text])
 
-    bank_key = identify_bank(full_text)
+    if bank_key is None:
+        if on_stage:
+            on_stage("bank_identification")
+        bank_key = context.bank[0]
     if bank_key == "unknown":
         supported = ', '.join(k.replace('_', ' ').title() for k in REGEX_TEMPLATES.keys())
         return {"status": "FAILED", "reason": f"Unknown issuer. Supported banks: {supported}"}
 
     template = REGEX_TEMPLATES.get(bank_key)
-    patterns = template["patterns"]
     bank_display_name = template["identifier"][0]
 
     extracted_data = {
@@ -221,74 +907,79 @@ def parse_statement(pdf_file: io.BytesIO, api_key: str = None) -> Dict[str, Any]
         "raw_text": full_text
     }
 
-    keys_to_search = ["statement_date", "payment_due_date", "total_due", "min_payment", "card_last_4_digits"]
-
     # RegEx Extraction
-    for key in keys_to_search:
-        extracted_data[key] = "NOT_FOUND"
-        
-        # Special handling for HDFC Total Dues
-        if bank_key == "hdfc" and key == "total_due":
-            hdfc_amount = extract_hdfc_total_dues(full_text)
-            if hdfc_amount:
-                extracted_data[key] = clean_amount(hdfc_amount)
-                continue
-        
-        # Special handling for IDFC amounts
-        if bank_key == "idfc" and key in ["total_due", "min_payment"]:
-            idfc_amounts = extract_idfc_amounts(full_text)
-            if idfc_amounts[key]:
-                extracted_data[key] = clean_amount(idfc_amounts[key])
-                continue
-        
-        for pattern_str in patterns.get(key, []):
-            try:
-                pattern = re.compile(pattern_str, re.IGNORECASE | re.MULTILINE | re.DOTALL)
-                match = pattern.search(full_text)
-                if match:
-                    value = match.group(1).strip()
-                    
-                    if key in ["total_due", "min_payment"]:
-                        value = clean_amount(value)
-                        if not value or not re.match(r'^\d+\.?\d*$', value):
-                            continue
-                        if key == "total_due" and float(value) == 0:
-                            continue
-                    
-                    value = re.sub(r'[\s\n]+', ' ', value).strip()
-                    
-                    if value:
-                        extracted_data[key] = value
-                        break
-            except re.error as e:
-                print(f"Regex error for key '{key}': {e}")
-                continue
+    if found is None:
+        if on_stage:
+            on_stage("regex")
+        found = extract_fields(full_text, bank_key, context=context)
+    fields = {key: found.get(key, "NOT_FOUND") for key in KEYS_TO_SEARCH}
+
+    # Validation: fields failing their own or cross-field checks are re-picked from the other matches
+    fields, scores = validation.validate_fields(
+        fields, bank_key, full_text, lambda key: iter_field_candidates(full_text, bank_key, key, context))
+    extracted_data.update(fields)
 
     # LLM Fallback
-    needs_fallback = any(extracted_data[key] == "NOT_FOUND" for key in ["total_due", "payment_due_date", "min_payment"])
+    low_confidence = [key for key in KEYS_TO_SEARCH if scores[key] < LLM_CONFIDENCE_THRESHOLD]
+    needs_fallback = any(key in low_confidence for key in FALLBACK_KEYS)
     is_key_valid = api_key and api_key != "GEMINI_API_KEY"
 
-    if needs_fallback and is_key_valid:
-        llm_results = extract_with_llm(full_text, api_key)
-        extracted_data["llm_status"] = llm_results.get("llm_status", "SKIPPED")
-
-        if llm_results.get("llm_status") == "SUCCESS":
-            extracted_data["extraction_method"] = "RegEx/LLM Fallback"
-            for key in keys_to_search:
-                if extracted_data[key] == "NOT_FOUND" and llm_results.get(key) not in ["NOT_FOUND", None]:
-                    value = llm_results[key]
-                    if key in ["total_due", "min_payment"]:
-                        value = clean_amount(value)
-                        try:
-                            if key == "total_due" and float(value) == 0:
-                                continue
-                        except:
-                            pass
-                    extracted_data[key] = value
-        elif llm_results.get("llm_status") == "FAILED":
-            extracted_data["llm_error"] = llm_results.get("reason", "Unknown LLM error.")
+    if needs_fallback and is_key_valid and defer_llm:
+        # The caller batches this request with other statements' (see llm_batch) and finishes
+        # the result with complete_llm_request
+        # The fields not sent keep the scores the full text gave them; the context alone may lack
+        # their evidence (e.g. the masked card number before the last four digits)
+        kept = {key: validation.field_score(key, fields[key], bank_key, full_text)
+                for key in KEYS_TO_SEARCH if key not in low_confidence}
+        extracted_data["llm_status"] = "PENDING"
+        extracted_data["llm_request"] = {"fields": low_confidence, "scores": kept,
+                                         "context": build_llm_context(full_text, low_confidence)}
+    elif needs_fallback and is_key_valid:
+        if on_stage:
+            on_stage("llm_fallback")
+        llm_results = extract_with_llm(full_text, api_key, fields=low_confidence)
+        merge_llm_results(extracted_data, llm_results, low_confidence)
     elif not is_key_valid:
         extracted_data["llm_status"] = "SKIPPED"
         extracted_data["llm_error"] = "Gemini API Key missing or placeholder."
 
+    if extracted_data["extraction_method"] != "RegEx":
+        scores = validation.score_fields({key: extracted_data[key] for key in KEYS_TO_SEARCH}, bank_key, full_text)
+    extracted_data["field_confidence"] = scores
+    extracted_data["confidence"] = min(scores.values())
     return extracted_data
+
+def merge_llm_results(extracted_data: MutableMapping[str, Any], llm_results: Dict[str, Any], fields: List[str]) -> None:
+    """Folds an LLM answer for the given fields into a result, cleaning amounts and skipping a zero total_due."""
+    extracted_data["llm_status"] = llm_results.get("llm_status", "SKIPPED")
+
+    if llm_results.get("llm_status") == "SUCCESS":
+        extracted_data["extraction_method"] = "RegEx/LLM Fallback"
+        for key in fields:
+            if llm_results.get(key) not in ["NOT_FOUND", None]:
+                value = llm_results[key]
+                if key in ["total_due", "min_payment"]:
+                    value = clean_amount(value)
+                    try:
+                        if key == "total_due" and float(value) == 0:
+                            continue
+                    except:
+                        pass
+                extracted_data[key] = value
+    elif llm_results.get("llm_status") == "FAILED":
+        extracted_data["llm_error"] = llm_results.get("reason", "Unknown LLM error.")
+
+def complete_llm_request(result: MutableMapping[str, Any], llm_results: Dict[str, Any]) -> None:
+    """
+    Finishes a PENDING result (from defer_llm=True) in place with the answer to its llm_request.
+    Only the fields sent to the LLM are checked again, against the request's context (the only
+    text the result still has); the others keep their scores from the full text. The cross-field
+    rules then run over all fields, as in parse_statement.
+    With a cache, parse_statement put the result's cache keys in llm_request["cache_keys"].
+    """
+    request = result.pop("llm_request")
+    merge_llm_results(result, llm_results, request["fields"])
+    scores = validation.score_fields({key: result[key] for key in KEYS_TO_SEARCH}, bank_key_for(result),
+                                     request["context"], request["scores"])
+    result["field_confidence"] = scores
+    result["confidence"] = min(scores.values())
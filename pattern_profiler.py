@@ -0,0 +1,75 @@
+import json
+import os
+import threading
+from typing import Dict, Any
+
+COUNTERS = ("attempts", "matches", "rejected", "seconds")
+
+
+class PatternProfiler:
+    """
+    Counts, per bank/field/pattern, how often a pattern was tried, matched, was rejected by
+    the zero/format checks after matching, and the cumulative search time.
+    Special extractors are recorded under their own pattern id (e.g. "hdfc_total_dues").
+    """
+
+    def __init__(self):
+        self._stats: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def record(self, bank_key: str, key: str, pattern_id, matched: bool, rejected: bool, seconds: float) -> None:
+        stat_id = (bank_key, key, str(pattern_id))
+        with self._lock:
+            stats = self._stats.get(stat_id)
+            if stats is None:
+                stats = self._stats[stat_id] = [0, 0, 0, 0.0]
+            stats[0] += 1
+            stats[1] += matched
+            stats[2] += rejected
+            stats[3] += seconds
+
+    def merge(self, snapshot: Dict[str, Any]) -> None:
+        """Adds a snapshot (e.g. from another process) into this profiler."""
+        with self._lock:
+            for bank_key, fields in snapshot.items():
+                for key, patterns in fields.items():
+                    for pattern_id, counters in patterns.items():
+                        stats = self._stats.setdefault((bank_key, key, pattern_id), [0, 0, 0, 0.0])
+                        for i, name in enumerate(COUNTERS):
+                            stats[i] += counters[name]
+
+    def snapshot(self, reset: bool = False) -> Dict[str, Any]:
+        """Returns the counters as {bank: {field: {pattern_id: {counter: value}}}}."""
+        with self._lock:
+            items = list(self._stats.items())
+            if reset:
+                self._stats = {}
+        result = {}
+        for (bank_key, key, pattern_id), stats in sorted(items):
+            result.setdefault(bank_key, {}).setdefault(key, {})[pattern_id] = dict(zip(COUNTERS, stats))
+        return result
+
+    def drain(self) -> Dict[str, Any]:
+        """Returns the counters and resets them; used to ship deltas out of worker processes."""
+        return self.snapshot(reset=True)
+
+    def dump(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+
+# The profiler the extraction loop reports to; None keeps profiling off
+active = PatternProfiler() if os.environ.get("PARSER_PROFILE") else None
+
+
+def enable() -> PatternProfiler:
+    """Turns profiling on (keeping any counters collected so far) and returns the profiler."""
+    global active
+    if active is None:
+        active = PatternProfiler()
+    return active
+
+
+def disable() -> None:
+    global active
+    active = None
@@ -0,0 +1,504 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Iterable, Pattern, Tuple, Union
+from regex_patterns import REGEX_TEMPLATES, FIELD_LABELS
+
+# combined and anchored read pattern structure with CPython's private regex parser; without it
+# they fall back to sequential
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python < 3.11
+    try:
+        import sre_parse
+        import sre_constants
+    except ImportError:
+        sre_parse = sre_constants = None
+
+PATTERN_FLAGS = re.IGNORECASE | re.MULTILINE | re.DOTALL
+
+# "re" or "re2"; with "re2", patterns RE2 can express run in linear time and the rest stay on re
+BACKENDS = ("re", "re2")
+_backend = os.environ.get("PARSER_REGEX_BACKEND", "re")
+
+# A search slower than this counts as an overrun and is reported. With PARSER_DISABLE_SLOW_PATTERNS=1
+# a pattern with BUDGET_STRIKES overruns is also disabled for the rest of the process
+PATTERN_BUDGET_SECONDS = float(os.environ.get("PARSER_PATTERN_BUDGET", "0.25"))
+BUDGET_STRIKES = 3
+DISABLE_SLOW_PATTERNS = os.environ.get("PARSER_DISABLE_SLOW_PATTERNS") == "1"
+
+# "combined" scans each field once with merged alternations; "sequential" runs one search per pattern;
+# "anchored" runs each labelled pattern only at the label occurrences found by one scan
+STRATEGIES = ("combined", "sequential", "anchored")
+_strategy = os.environ.get("PARSER_MATCH_STRATEGY", "sequential")
+
+_compiled: Dict[str, Dict[str, List[Pattern]]] = {}
+_matchers: Dict[Tuple[str, str], "FieldMatcher"] = {}
+_anchored: Dict[Tuple[str, str], "AnchoredMatcher"] = {}
+_anchor_scanners: Dict[str, tuple] = {}
+_labels: Dict[str, Pattern] = {}
+_identifiers = None
+_strikes: Dict[Tuple[str, str, Union[int, str]], int] = {}
+disabled = set()
+_lock = threading.Lock()
+
+
+class TemplateError(ValueError):
+    """Raised when a bank template contains a pattern that does not compile."""
+
+
+def compile_re2(pattern_str: str):
+    """Compiles a template pattern with RE2, or returns None if RE2 is missing or cannot express it."""
+    try:
+        import re2
+    except ImportError:
+        return None
+    options = re2.Options()
+    options.log_errors = False
+    try:
+        return re2.compile("(?ims)" + pattern_str, options)
+    except re2.error:
+        return None
+
+
+def compile_pattern(pattern_str: str, backend: str = None):
+    """
+    Compiles a template pattern with the template flags.
+    The pattern is always validated with re; on the re2 backend the RE2 version is used when it exists.
+    """
+    pattern = re.compile(pattern_str, PATTERN_FLAGS)
+    if (backend or _backend) == "re2":
+        return compile_re2(pattern_str) or pattern
+    return pattern
+
+
+def _compile_bank(bank_key: str) -> Dict[str, List[Pattern]]:
+    """Compiles every pattern of one bank template, failing on the first bad one."""
+    template = REGEX_TEMPLATES[bank_key]
+    compiled = {}
+    for key, pattern_strs in template.get("patterns", {}).items():
+        compiled[key] = []
+        for index, pattern_str in enumerate(pattern_strs):
+            try:
+                compiled[key].append(compile_pattern(pattern_str))
+            except re.error as e:
+                raise TemplateError(f"Invalid pattern {bank_key}.{key}[{index}]: {e}") from e
+    return compiled
+
+
+def get_patterns(bank_key: str) -> Dict[str, List[Pattern]]:
+    """Returns the compiled patterns of a bank, compiling them on first use."""
+    patterns = _compiled.get(bank_key)
+    if patterns is None:
+        with _lock:
+            patterns = _compiled.get(bank_key)
+            if patterns is None:
+                patterns = _compile_bank(bank_key)
+                _compiled[bank_key] = patterns
+    return patterns
+
+
+_CATEGORY_CLASSES = {
+    sre_constants.CATEGORY_DIGIT: r"\d",
+    sre_constants.CATEGORY_SPACE: r"\s",
+    sre_constants.CATEGORY_WORD: r"\w",
+} if sre_constants is not None else {}
+# A label prefix shorter than this is too common to anchor on; such patterns are scanned in full
+MIN_ANCHOR_CHARS = 3
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, getattr(sre_constants, "POSSESSIVE_REPEAT", None)} \
+    if sre_constants is not None else set()
+
+
+def _first_chars(items) -> Tuple[set, bool]:
+    """
+    Character-class parts that can start a match of a parsed (sub)pattern, and whether it can be empty.
+    Returns (None, False) when any character may start a match.
+    """
+    chars = set()
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            return chars | {re.escape(chr(av))}, False
+        if op is sre_constants.IN:
+            for in_op, in_av in av:
+                if in_op is sre_constants.LITERAL:
+                    chars.add(re.escape(chr(in_av)))
+                elif in_op is sre_constants.RANGE:
+                    chars.add(f"{re.escape(chr(in_av[0]))}-{re.escape(chr(in_av[1]))}")
+                elif in_op is sre_constants.CATEGORY and in_av in _CATEGORY_CLASSES:
+                    chars.add(_CATEGORY_CLASSES[in_av])
+                else:
+                    return None, False
+            return chars, False
+        if op in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            continue  # zero-width: the next item decides
+        if op is sre_constants.SUBPATTERN:
+            branches, min_repeat = [av[-1]], 1
+        elif op is sre_constants.BRANCH:
+            branches, min_repeat = av[1], 1
+        elif op in _REPEATS:
+            branches, min_repeat = [av[2]], av[0]
+        else:
+            return None, False
+        nullable = min_repeat == 0
+        for branch in branches:
+            branch_chars, branch_nullable = _first_chars(branch)
+            if branch_chars is None:
+                return None, False
+            chars |= branch_chars
+            nullable = nullable or branch_nullable
+        if not nullable:
+            return chars, False
+    return chars, True
+
+
+def first_char_class(pattern_strs: List[str]) -> str:
+    """
+    A character class matching every character that can start a match of any of the patterns,
+    e.g. "[ACT]", or None when that set is unbounded. Case folding comes from the flags it is compiled with.
+    """
+    chars = set()
+    for pattern_str in pattern_strs:
+        pattern_chars, nullable = _first_chars(sre_parse.parse(pattern_str, PATTERN_FLAGS))
+        if pattern_chars is None or nullable:
+            return None
+        chars |= pattern_chars
+    return "[" + "".join(sorted(chars)) + "]"
+
+
+class FieldMatcher:
+    """
+    Scans a field's ordered pattern list in one pass while keeping list priority.
+
+    candidates() yields (pattern index, group 1) for every pattern that matches, lowest index
+    first, each with that pattern's first match. This is the sequence the sequential loop would
+    see, so the first candidate passing validation is the same winner.
+
+    A merged alternation of patterns [lo, hi) finds the leftmost position where any of them matches
+    and, at that position, the lowest matching index j. Patterns below j cannot match earlier, so the
+    scan continues after that position with only [lo, j), until none is left.
+
+    When the alternation runs on re, a first-character lookahead is prepended, since an alternation
+    loses the literal-prefix scan each pattern gets on its own. RE2 needs no prefilter.
+
+    Given an attempts dict, candidates() adds every pattern index whose outcome the scan has settled
+    so far, with the seconds spent on it alone: a pattern searched on its own gets its search time,
+    one only ever searched inside an alternation gets 0.0 (the alternation's time is not divisible).
+
+    indexes gives each pattern's index in the template's list, when some are left out (disabled);
+    candidates and attempts use those indexes.
+    """
+
+    def __init__(self, pattern_strs: List[str], patterns: List[Pattern], indexes: List[int] = None):
+        self.pattern_strs = pattern_strs
+        self.patterns = patterns
+        self.indexes = indexes if indexes is not None else list(range(len(patterns)))
+        self._combined: Dict[Tuple[int, int], tuple] = {}
+
+    def _get_combined(self, lo: int, hi: int) -> tuple:
+        combined = self._combined.get((lo, hi))
+        if combined is None:
+            alternation = "|".join(f"(?P<_{i}>{self.pattern_strs[i]})" for i in range(lo, hi))
+            pattern = compile_pattern(alternation)
+            char_class = first_char_class(self.pattern_strs[lo:hi]) if isinstance(pattern, re.Pattern) else None
+            if char_class:
+                pattern = compile_pattern(f"(?={char_class})(?:{alternation})", "re")
+            wrappers = [(i, pattern.groupindex[f"_{i}"]) for i in range(lo, hi)]
+            combined = self._combined[(lo, hi)] = (pattern, wrappers)
+        return combined
+
+    def _first_match(self, text: str, lo: int, attempts: Dict[int, float] = None):
+        """Lowest pattern index >= lo that matches anywhere, with the group 1 of its first match."""
+        best = None
+        hi = len(self.pattern_strs)
+        pos = 0
+        while hi > lo and pos <= len(text):
+            if hi - lo == 1:
+                # A single pattern keeps its own fast scan
+                started = time.perf_counter()
+                match = self.patterns[lo].search(text, pos)
+                if attempts is not None:
+                    index = self.indexes[lo]
+                    attempts[index] = attempts.get(index, 0.0) + time.perf_counter() - started
+                return (lo, match.group(1)) if match else best
+            pattern, wrappers = self._get_combined(lo, hi)
+            match = pattern.search(text, pos)
+            if not match:
+                break
+            for index, group in wrappers:
+                if match.group(group) is not None:
+                    best = (index, match.group(group + 1))
+                    break
+            hi = best[0]
+            pos = match.start() + 1
+        return best
+
+    def candidates(self, text: str, attempts: Dict[int, float] = None):
+        lo = 0
+        while lo < len(self.pattern_strs):
+            found = self._first_match(text, lo, attempts)
+            if attempts is not None:
+                # Every index below the one found (or all of them) is now known not to match
+                for position in range(lo, found[0] + 1 if found else len(self.pattern_strs)):
+                    attempts.setdefault(self.indexes[position], 0.0)
+            if found is None:
+                return
+            yield self.indexes[found[0]], found[1]
+            lo = found[0] + 1
+
+
+def _label_prefixes(items) -> List[str]:
+    """
+    Literal prefixes, one of which starts every match of a parsed (sub)pattern, e.g. ["total"] for
+    Total\s+Dues or ["your", "total"] for (?:Your\s+)?Total. None when a match can start anywhere.
+    """
+    prefix = ""
+    for position, (op, av) in enumerate(items):
+        if op is sre_constants.LITERAL:
+            prefix += chr(av)
+            continue
+        if prefix:
+            break
+        if op in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            continue
+        if op is sre_constants.SUBPATTERN:
+            return _label_prefixes(av[-1])
+        if op is sre_constants.BRANCH:
+            prefixes = [_label_prefixes(branch) for branch in av[1]]
+            return None if None in prefixes else [p for branch in prefixes for p in branch]
+        if op in _REPEATS:
+            prefixes = _label_prefixes(av[2])
+            if prefixes is None or av[0] > 0:
+                return prefixes
+            rest = _label_prefixes(items[position + 1:])
+            return None if rest is None else prefixes + rest
+        return None
+    return [prefix.lower()] if len(prefix) >= MIN_ANCHOR_CHARS else None
+
+
+class AnchoredMatcher:
+    """
+    Yields the same (pattern index, group 1) candidates as FieldMatcher, but each labelled pattern
+    is only tried with match() at the occurrences of its label prefixes. Every match of the pattern
+    starts at one of them, so the first that matches is where search() would have matched; the match
+    may run as far into the text as search() would let it (e.g. across a .*? gap).
+    Label-less patterns (e.g. [\*Xx]{4,}\s*(\d{4})) are searched over the whole text.
+    Given an attempts dict, candidates() adds every pattern index it tries, with the seconds spent on it.
+    indexes works as in FieldMatcher.
+    """
+
+    def __init__(self, pattern_strs: List[str], patterns: List[Pattern], indexes: List[int] = None):
+        self.entries = []
+        indexes = indexes if indexes is not None else range(len(patterns))
+        for index, pattern_str, pattern in zip(indexes, pattern_strs, patterns):
+            parsed = sre_parse.parse(pattern_str, PATTERN_FLAGS)
+            self.entries.append((index, pattern, _label_prefixes(parsed)))
+
+    def candidates(self, text: str, anchors: Dict[str, List[int]], attempts: Dict[int, float] = None):
+        for index, pattern, prefixes in self.entries:
+            started = time.perf_counter()
+            if prefixes is None:
+                match = pattern.search(text)
+            else:
+                match = None
+                positions = anchors.get(prefixes[0], []) if len(prefixes) == 1 else \
+                    sorted({p for prefix in prefixes for p in anchors.get(prefix, [])})
+                for position in positions:
+                    match = pattern.match(text, position)
+                    if match:
+                        break
+            if attempts is not None:
+                attempts[index] = time.perf_counter() - started
+            if match:
+                yield index, match.group(1)
+
+
+def _enabled_patterns(bank_key: str, key: str) -> Tuple[List[str], List[Pattern], List[int]]:
+    """A field's pattern sources, compiled patterns and template indexes, without the disabled ones."""
+    pattern_strs = REGEX_TEMPLATES[bank_key]["patterns"].get(key, [])
+    patterns = get_patterns(bank_key).get(key, [])
+    indexes = [i for i in range(len(patterns)) if (bank_key, key, i) not in disabled]
+    return [pattern_strs[i] for i in indexes], [patterns[i] for i in indexes], indexes
+
+
+def get_anchored_matcher(bank_key: str, key: str) -> AnchoredMatcher:
+    """Returns the anchored matcher for one field of a bank, leaving out disabled patterns."""
+    matcher = _anchored.get((bank_key, key))
+    if matcher is None:
+        matcher = _anchored[(bank_key, key)] = AnchoredMatcher(*_enabled_patterns(bank_key, key))
+    return matcher
+
+
+def get_anchor_scanner(bank_key: str) -> Tuple[Pattern, Pattern, Dict[str, List[str]]]:
+    """
+    Returns patterns finding the label prefixes of a bank's patterns, longest first: a case-sensitive
+    one for lower-cased text (which keeps re's first-character skip) and an IGNORECASE one for text whose
+    length changes when lower-cased. Also returns a map from each matched prefix to all the prefixes
+    it starts with ("minimum" -> "minimum", "min").
+    """
+    scanner = _anchor_scanners.get(bank_key)
+    if scanner is None:
+        prefixes = set()
+        for key in REGEX_TEMPLATES[bank_key].get("patterns", {}):
+            for _, _, entry_prefixes in get_anchored_matcher(bank_key, key).entries:
+                prefixes.update(entry_prefixes or [])
+        ordered = sorted(prefixes, key=len, reverse=True)
+        covers = {prefix: [p for p in ordered if prefix.startswith(p)] for prefix in ordered}
+        alternation = "|".join(map(re.escape, ordered))
+        if ordered:
+            scanner = (re.compile(alternation), re.compile(alternation, re.IGNORECASE), covers)
+        else:
+            scanner = (None, None, covers)
+        _anchor_scanners[bank_key] = scanner
+    return scanner
+
+
+def build_anchor_index(text: str, bank_key: str, lowered: str = None) -> Dict[str, List[int]]:
+    """
+    Positions of every label prefix of the bank's patterns in the text, including overlapping ones.
+    lowered is text.lower() when the caller already has it.
+    """
+    pattern, folded_pattern, covers = get_anchor_scanner(bank_key)
+    anchors: Dict[str, List[int]] = {}
+    if pattern is None:
+        return anchors
+    if lowered is None:
+        lowered = text.lower()
+    if len(lowered) != len(text):
+        pattern, lowered = folded_pattern, text
+    # Restarting one character after each hit keeps overlapping labels such as XXXX in XXXXXX1234
+    search = pattern.search
+    match = search(lowered)
+    while match:
+        for prefix in covers.get(match.group().lower(), ()):
+            anchors.setdefault(prefix, []).append(match.start())
+        match = search(lowered, match.start() + 1)
+    return anchors
+
+
+def get_field_matcher(bank_key: str, key: str) -> FieldMatcher:
+    """
+    Returns the combined matcher for one field of a bank, leaving out disabled patterns; patterns are
+    validated first via get_patterns.
+    """
+    matcher = _matchers.get((bank_key, key))
+    if matcher is None:
+        matcher = _matchers[(bank_key, key)] = FieldMatcher(*_enabled_patterns(bank_key, key))
+    return matcher
+
+
+def get_strategy() -> str:
+    return _strategy if sre_parse is not None else "sequential"
+
+
+def set_strategy(strategy: str) -> None:
+    global _strategy
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown match strategy '{strategy}'. Choose from: {', '.join(STRATEGIES)}")
+    if strategy != "sequential" and sre_parse is None:
+        print(f"Match strategy '{strategy}' needs Python's sre_parse module, which is not available; using sequential.")
+    _strategy = strategy
+
+
+def get_label_pattern(field: str) -> Pattern:
+    """Returns one compiled alternation of all labels that introduce a field."""
+    pattern = _labels.get(field)
+    if pattern is None:
+        try:
+            pattern = re.compile("|".join(f"(?:{label})" for label in FIELD_LABELS[field]), re.IGNORECASE)
+        except re.error as e:
+            raise TemplateError(f"Invalid label for {field}: {e}") from e
+        _labels[field] = pattern
+    return pattern
+
+
+def get_identifier_pattern() -> Tuple[Pattern, Dict[str, str]]:
+    """
+    Returns one compiled alternation of every bank identifier, each in its own named group,
+    plus a map from group name to bank key (read a hit's bank through match.lastgroup).
+    Longer identifiers come first, so "HDFC BANK" wins over "HDFC" at the same position.
+    """
+    global _identifiers
+    if _identifiers is None:
+        # Normalized identifier (upper case, single spaces) -> bank key; the first bank listing one keeps it
+        banks = {}
+        for bank_key, template in REGEX_TEMPLATES.items():
+            for identifier in template.get("identifier", []):
+                banks.setdefault(" ".join(identifier.upper().split()), bank_key)
+        alternatives = sorted(banks, key=len, reverse=True)
+        owners = {f"i{index}": banks[identifier] for index, identifier in enumerate(alternatives)}
+        # The first-character lookahead lets the scan skip most positions without trying every alternative
+        first_chars = "".join(sorted({re.escape(i[0]) for i in alternatives}))
+        pattern = re.compile(
+            f"(?=[{first_chars}])(?:" + "|".join(f"(?P<i{index}>" + r"\s+".join(map(re.escape, identifier.split(" "))) + ")"
+                                                 for index, identifier in enumerate(alternatives)) + ")",
+            re.IGNORECASE,
+        )
+        _identifiers = (pattern, owners)
+    return _identifiers
+
+
+def get_backend() -> str:
+    return _backend
+
+
+def set_backend(backend: str) -> None:
+    """Switches the regex backend; patterns are recompiled on next use."""
+    global _backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown regex backend '{backend}'. Choose from: {', '.join(BACKENDS)}")
+    if backend == "re2" and compile_re2("a") is None:
+        print("RE2 backend requested but the re2 module is not installed; using re.")
+    _backend = backend
+    clear()
+
+
+def record_overrun(bank_key: str, key: str, index: Union[int, str], elapsed: float) -> None:
+    """
+    Reports a search that exceeded PATTERN_BUDGET_SECONDS. index is a pattern index, or the strategy
+    name ("combined", "anchored") for a field's whole scan. With DISABLE_SLOW_PATTERNS, a pattern
+    index is disabled after BUDGET_STRIKES overruns; a whole scan is only ever reported.
+    """
+    pattern_id = (bank_key, key, index)
+    with _lock:
+        strikes = _strikes.get(pattern_id, 0) + 1
+        _strikes[pattern_id] = strikes
+        disable = DISABLE_SLOW_PATTERNS and isinstance(index, int) and strikes == BUDGET_STRIKES
+        if disable:
+            disabled.add(pattern_id)
+            # The field's matchers are rebuilt without it on next use
+            _matchers.pop((bank_key, key), None)
+            _anchored.pop((bank_key, key), None)
+    print(f"Pattern {bank_key}.{key}[{index}] took {elapsed:.3f}s (budget {PATTERN_BUDGET_SECONDS}s, strike {strikes})")
+    if disable:
+        print(f"Pattern {bank_key}.{key}[{index}] disabled after {strikes} budget overruns")
+
+
+def disabled_fingerprint() -> str:
+    """Short digest of the disabled patterns, for cache keys; empty while none are disabled."""
+    with _lock:
+        if not disabled:
+            return ""
+        ids = sorted(f"{bank_key}.{key}[{index}]" for bank_key, key, index in disabled)
+    return hashlib.sha256("|".join(ids).encode("utf-8")).hexdigest()[:12]
+
+
+def warmup(bank_keys: Iterable[str] = None) -> None:
+    """Compiles the given banks (all banks by default), e.g. at worker start."""
+    for bank_key in (bank_keys if bank_keys is not None else REGEX_TEMPLATES.keys()):
+        get_patterns(bank_key)
+        get_anchor_scanner(bank_key)
+    get_identifier_pattern()
+
+
+def clear() -> None:
+    """Drops all compiled patterns so they are rebuilt from REGEX_TEMPLATES."""
+    global _identifiers
+    with _lock:
+        _compiled.clear()
+        _matchers.clear()
+        _anchored.clear()
+        _anchor_scanners.clear()
+        _labels.clear()
+        _identifiers = None
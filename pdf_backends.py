@@ -0,0 +1,105 @@
+import importlib
+from typing import Callable, Dict, Iterator, Sequence
+
+# pdfplumber and pdfminer are imported by the backend that uses them, so text-only callers never load them
+
+# Gaps (in PDF points) that start a new line or word in the text-stream backend; pdfplumber's defaults
+Y_TOLERANCE = 3
+X_TOLERANCE = 3
+
+DEFAULT_BACKEND = "pdfplumber"
+
+
+def iter_pages_pdfplumber(pdf_file, pages: Sequence[int] = None) -> Iterator[str]:
+    """Full character-level layout reconstruction with pdfplumber."""
+    import pdfplumber
+
+    with pdfplumber.open(pdf_file, pages=[n + 1 for n in pages] if pages is not None else None) as pdf:
+        for page in pdf.pages:
+            text = page.extract_text()
+            # Drop the page's cached characters and layout objects before moving on
+            page.close()
+            yield text or ""
+
+
+def _text_stream_device(resource_manager):
+    """A pdfminer device that writes characters in content-stream order without building layout objects."""
+    from pdfminer.pdfdevice import PDFTextDevice
+    from pdfminer.pdffont import PDFUnicodeNotDefined
+
+    class TextStreamDevice(PDFTextDevice):
+        def begin_page(self, page, ctm) -> None:
+            super().begin_page(page, ctm)
+            self.parts = []
+            self.last = None
+
+        def render_char(self, matrix, font, fontsize, scaling, rise, cid, ncs, graphicstate) -> float:
+            try:
+                text = font.to_unichr(cid)
+            except PDFUnicodeNotDefined:
+                text = ""
+            advance = font.char_width(cid) * fontsize * scaling
+            a, _, _, d, x, y = matrix
+            if self.last is not None:
+                last_end, last_y = self.last
+                if abs(y - last_y) > Y_TOLERANCE:
+                    self.parts.append("\n")
+                elif x - last_end > X_TOLERANCE:
+                    self.parts.append(" ")
+            self.parts.append(text)
+            self.last = (x + a * advance, y)
+            return advance
+
+    return TextStreamDevice(resource_manager)
+
+
+def iter_pages_textstream(pdf_file, pages: Sequence[int] = None) -> Iterator[str]:
+    """
+    Text in content-stream order via pdfminer's interpreter, skipping layout analysis.
+    Much faster, but only matches pdfplumber on PDFs that draw text in reading order.
+    """
+    from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+    from pdfminer.pdfpage import PDFPage
+
+    resource_manager = PDFResourceManager(caching=True)
+    device = _text_stream_device(resource_manager)
+    interpreter = PDFPageInterpreter(resource_manager, device)
+    for page in PDFPage.get_pages(pdf_file, pagenos=set(pages) if pages is not None else None):
+        interpreter.process_page(page)
+        yield "".join(device.parts)
+
+
+BACKENDS: Dict[str, Callable[..., Iterator[str]]] = {
+    "pdfplumber": iter_pages_pdfplumber,
+    "textstream": iter_pages_textstream,
+}
+
+
+def iter_pages(pdf_file, backend: str = None, pages: Sequence[int] = None) -> Iterator[str]:
+    """
+    Yields the raw text of each page with the named backend (default DEFAULT_BACKEND).
+    pages limits extraction to those zero-based page numbers, in document order.
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown PDF backend '{backend}'. Choose from: {', '.join(BACKENDS)}")
+    return BACKENDS[backend](pdf_file, pages)
+
+
+def preload() -> None:
+    """Imports what every backend needs now, for worker initializers that should not pay for it on the first document."""
+    for module in ("pdfplumber", "pdfminer.pdfdocument", "pdfminer.pdfinterp", "pdfminer.pdfpage"):
+        importlib.import_module(module)
+
+
+def count_pages(pdf_file) -> int:
+    """Page count from the document's page tree, without reading any page content; 0 if unreadable."""
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfparser import PDFParser
+    from pdfminer.pdftypes import resolve1
+
+    try:
+        document = PDFDocument(PDFParser(pdf_file))
+        return int(resolve1(resolve1(document.catalog["Pages"])["Count"]))
+    except Exception:
+        return 0
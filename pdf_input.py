@@ -0,0 +1,89 @@
+import io
+import mmap
+import os
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Union
+
+# Everything parse_statement accepts as a PDF: a path, an object supporting the buffer protocol
+# (bytes, bytearray, memoryview, mmap, numpy arrays, ...) or a binary file object
+PdfSource = Union[str, os.PathLike, bytes, bytearray, memoryview, mmap.mmap, BinaryIO]
+
+
+class BufferReader(io.RawIOBase):
+    """
+    Seekable read-only file over any buffer, without copying it: each read copies only the
+    bytes it returns. getbuffer() exposes the whole buffer, like BytesIO.getbuffer().
+    name is the path of a memory-mapped file, like a real file's name; None for other buffers.
+    """
+
+    def __init__(self, buffer, name: str = None):
+        super().__init__()
+        self._view = memoryview(buffer).cast("B")
+        self._position = 0
+        self.name = name
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, target) -> int:
+        chunk = self._view[self._position:self._position + len(target)]
+        target[:len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._view) if size is None or size < 0 else self._position + size
+        chunk = bytes(self._view[self._position:end])
+        self._position += len(chunk)
+        return chunk
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._position = max(0, offset)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def getbuffer(self) -> memoryview:
+        return self._view
+
+    def close(self) -> None:
+        # The view must be released before an underlying mmap can be closed
+        self._view.release()
+        super().close()
+
+
+@contextmanager
+def open_pdf(source: PdfSource) -> Iterator[BinaryIO]:
+    """
+    A seekable binary file for any PdfSource. Paths are memory-mapped and buffers are read in
+    place, so the PDF is never copied into a bytes object; file objects are passed through
+    as they are and left open.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # mmap cannot map an empty file
+                yield BufferReader(b"")
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+                reader = BufferReader(mapping, os.fspath(source))
+                try:
+                    yield reader
+                finally:
+                    reader.close()
+    elif isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)) or not hasattr(source, "read"):
+        reader = BufferReader(source)
+        try:
+            yield reader
+        finally:
+            reader.close()
+    else:
+        yield source
@@ -15,6 +15,21 @@ AMOUNT_PATTERNS = [
 
 
 
+# Labels that introduce each field; used to cut text windows for the LLM fallback
+FIELD_LABELS = {
+    "statement_date": [r"Statement\s+(?:Date|Dt|Period)", r"Date\s+of\s+Statement", r"Billing\s+Date", r"Stmt\.?\s+Date", r"Statement\s+as\s+on"],
+    "payment_due_date": [r"(?:Payment\s+)?Due\s+Date", r"Pay\s+by", r"Due\s+on", r"Last\s+(?:Date\s+(?:of|for)\s+)?Payment"],
+    "total_due": [r"Total\s+(?:Amount\s+|Payment\s+)?Dues?", r"Total\s+Outstanding", r"Total\s+Payable", r"Closing\s+Balance", r"Amount\s+(?:Due|Payable)"],
+    "min_payment": [r"Minimum\s+(?:Amount\s+|Payment\s+)?Due", r"Minimum\s+(?:Payment|Amt)", r"Min\.?\s+(?:Amt|Amount|Payment)", r"\bMAD\b"],
+    "card_last_4_digits": [r"(?:Credit\s+)?Card\s+(?:No|Number|Account)", r"Account\s+Number", r"[\*Xx]{4}[\s\-]*\d{4}"],
+}
+
+
+
+# Each template has "identifier" strings and ordered "patterns" per field. An optional "backend"
+# names the PDF text backend (see pdf_backends.BACKENDS) the bank's statements are validated
+# against; without it pdfplumber is used. An optional "transaction_date_format" (strptime syntax)
+# is the date format of the bank's transaction rows; without it "%d/%m/%Y" is tried first.
 REGEX_TEMPLATES = {
     
     "hdfc": {
@@ -39,7 +54,7 @@ REGEX_TEMPLATES = {
                 r"Account\s+Summary[\s\S]{1,500}?Total\s+Dues[\s\S]{0,50}?([\d,]+\.[\d]{2})",
                 r"Finance\s+Charges[\s\S]{0,150}?Total\s+Dues[\s\S]{0,50}?([\d,]+\.[\d]{2})",
                 # Look for Total Dues NOT in the "Past Dues" or table header context
-                r"(?<!Minimum\s+Amount\s+Due)(?<!Past\s+Dues)(?<!Current\s+Dues)Total\s+Dues\s*\n?\s*([\d,]+\.[\d]{2})",
+                r"(?<!Minimum Amount Due )(?<!Past Dues )(?<!Current Dues )Total\s+Dues\s*\n?\s*([\d,]+\.[\d]{2})",
                 # Match in table format with equals sign
                 r"=\s*Total\s+Dues\s+([\d,]+\.[\d]{2})",
                 # Pattern that looks for non-zero amounts specifically
@@ -0,0 +1,146 @@
+import hashlib
+import io
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from regex_patterns import REGEX_TEMPLATES
+import validation
+
+WHITESPACE_RUN_RE = re.compile(r'\s+')
+
+
+def hash_pdf(pdf_file: io.BytesIO) -> str:
+    """
+    SHA-256 of the PDF bytes; the stream is rewound so it can still be parsed.
+    In-memory and memory-mapped inputs (anything with getbuffer) are hashed in place.
+    """
+    digest = hashlib.sha256()
+    if hasattr(pdf_file, "getbuffer"):
+        digest.update(pdf_file.getbuffer())
+    else:
+        position = pdf_file.tell()
+        for chunk in iter(lambda: pdf_file.read(1 << 20), b""):
+            digest.update(chunk)
+        pdf_file.seek(position)
+    return digest.hexdigest()
+
+
+def hash_text(text: str) -> str:
+    """SHA-256 of the extracted text with whitespace runs collapsed, so re-exports of the same statement match."""
+    normalized = WHITESPACE_RUN_RE.sub(' ', text).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def config_fingerprint(model: str) -> str:
+    """Fingerprint of everything that changes parse results: the templates, the validation limits and the LLM model."""
+    limits = [validation.MAX_DUE_DAYS, validation.MIN_YEAR, validation.MAX_YEARS_AHEAD, validation.MAX_CANDIDATES]
+    config = json.dumps({"templates": REGEX_TEMPLATES, "validation": limits, "model": model}, sort_keys=True)
+    return hashlib.sha256(config.encode("utf-8")).hexdigest()[:16]
+
+
+class ResultCache:
+    """
+    Two-tier cache for parse results: an in-process LRU bounded by entry count and size,
+    plus an optional SQLite file that several worker processes can share.
+    Values are stored as JSON, so every hit returns a fresh dict.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024, db_path: str = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.db_path = db_path
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_pid = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, kind: str, digest: str, model: str, variant: str = "") -> str:
+        """Builds a cache key; the config fingerprint invalidates entries when templates or model change."""
+        return f"{config_fingerprint(model)}:{variant}:{kind}:{digest}"
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections cannot cross a fork, so each process opens its own
+        if self._db is None or self._db_pid != os.getpid():
+            self._db = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._db_pid = os.getpid()
+        return self._db
+
+    def _remember(self, key: str, value: str) -> None:
+        if key in self._entries:
+            self._size -= len(self._entries.pop(key))
+        self._entries[key] = value
+        self._size += len(value)
+        while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return json.loads(value)
+
+            if self.db_path:
+                row = self._connection().execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row:
+                    self._remember(key, row[0])
+                    self.disk_hits += 1
+                    return json.loads(row[0])
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        value = json.dumps(result)
+        with self._lock:
+            self._remember(key, value)
+            if self.db_path:
+                db = self._connection()
+                with db:
+                    db.execute(
+                        "INSERT OR REPLACE INTO results (key, value, created) VALUES (?, ?, ?)",
+                        (key, value, time.time()),
+                    )
+
+    def purge_stale(self, model: str) -> int:
+        """Deletes on-disk entries written under a different templates/model fingerprint."""
+        if not self.db_path:
+            return 0
+        with self._lock:
+            db = self._connection()
+            with db:
+                cursor = db.execute("DELETE FROM results WHERE key NOT LIKE ?", (config_fingerprint(model) + ":%",))
+            return cursor.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+            }
@@ -0,0 +1,226 @@
+import argparse
+import asyncio
+import importlib
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List
+
+from aiohttp import web
+
+import normalize
+import parser
+import pdf_backends
+import pattern_registry
+from parse_result import ParseResult
+from parser import parse_statement, bank_key_for
+from result_cache import ResultCache
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_TIMEOUT = 30.0
+MAX_UPLOAD_MB = 50
+
+# Per-worker result cache, set up by init_worker
+_cache = None
+
+
+def init_worker(cache_db: str = None, memory_limit_mb: float = None, preload_llm: bool = False) -> None:
+    """
+    Worker initializer: imports the PDF libraries (and requests, with preload_llm), compiles all
+    templates and opens the result cache.
+    """
+    global _cache
+    pdf_backends.preload()
+    if preload_llm:
+        importlib.import_module("requests")
+    pattern_registry.warmup()
+    if memory_limit_mb:
+        parser.MEMORY_LIMIT_MB = memory_limit_mb
+    _cache = ResultCache(db_path=cache_db) if cache_db else None
+
+
+def worker_ready() -> int:
+    """No-op task used to start every worker before the first request."""
+    return os.getpid()
+
+
+def parse_upload(data: bytes, api_key: str = None, incremental: bool = False, streaming: bool = False,
+                 typed: bool = False, deadline: float = None, keep_raw_text: bool = False) -> ParseResult:
+    """
+    Parses one uploaded PDF in a worker. A request whose deadline (time.time() value) passed while
+    it waited in the queue is not parsed at all.
+    """
+    if deadline is not None and time.time() > deadline:
+        return ParseResult(status="FAILED", reason="Deadline exceeded before parsing started.")
+    result = parse_statement(data, api_key=api_key, incremental=incremental, cache=_cache,
+                             streaming=streaming, keep_raw_text=keep_raw_text)
+    if typed and result.get("status") == "SUCCESS":
+        result = normalize.normalize_fields(result, bank_key_for(result))
+    return result
+
+
+class ParseService:
+    """
+    Runs parse requests on a pool of pre-started worker processes. At most jobs + queue_size requests
+    are admitted at once; the rest are turned away with 503 and a Retry-After estimate.
+    Each request has a deadline, after which it is answered with 504; a parse already running
+    keeps its slot until the worker finishes it.
+    """
+
+    def __init__(self, jobs: int = None, queue_size: int = DEFAULT_QUEUE_SIZE, timeout: float = DEFAULT_TIMEOUT,
+                 api_key: str = None, cache_db: str = None, memory_limit_mb: float = None):
+        self.jobs = jobs or os.cpu_count() or 1
+        self.capacity = self.jobs + queue_size
+        self.timeout = timeout
+        self.api_key = api_key
+        self.initargs = (cache_db, memory_limit_mb, bool(api_key and api_key != "GEMINI_API_KEY"))
+        self.executor = self.new_executor()
+        self.in_flight = 0
+        # Running mean of seconds per parse, for Retry-After
+        self.mean_seconds = 1.0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.jobs, initializer=init_worker, initargs=self.initargs)
+
+    def start(self) -> List[int]:
+        """Starts every worker (running its initializer) and returns their pids."""
+        futures = [self.executor.submit(worker_ready) for _ in range(self.jobs)]
+        return sorted({future.result() for future in futures})
+
+    def retry_after(self) -> int:
+        """Seconds until a queue slot is likely to free up."""
+        return max(1, math.ceil(self.mean_seconds * (self.in_flight - self.jobs + 1) / self.jobs))
+
+    async def parse(self, data: bytes, timeout: float = None, include_raw_text: bool = False,
+                    **options) -> web.Response:
+        """Parses one PDF with the given parse_upload options; timeout can only shorten the service deadline."""
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            return web.json_response({"status": "FAILED", "reason": "Server busy, try again later."}, status=503,
+                                     headers={"Retry-After": str(self.retry_after())})
+
+        timeout = min(timeout or self.timeout, self.timeout)
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        try:
+            future = executor.submit(parse_upload, data, self.api_key, deadline=time.time() + timeout,
+                                     keep_raw_text=include_raw_text, **options)
+        except BrokenProcessPool:
+            executor = self.executor = self.new_executor()
+            future = executor.submit(parse_upload, data, self.api_key, deadline=time.time() + timeout,
+                                     keep_raw_text=include_raw_text, **options)
+        self.in_flight += 1
+        # The slot is released when the pool is done with the task, not when the client gives up on it
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self.release))
+        try:
+            # Cancelling the wrapper also cancels the pool task if it has not started yet
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            return web.json_response({"status": "FAILED", "reason": f"Deadline of {timeout:g}s exceeded."}, status=504)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); later requests get a fresh pool
+            if self.executor is executor:
+                self.executor = self.new_executor()
+            return web.json_response({"status": "FAILED", "reason": "Worker process died while parsing."}, status=500)
+        except Exception as e:
+            return web.json_response({"status": "FAILED", "reason": f"Unexpected error: {e}"}, status=500)
+
+        elapsed = time.monotonic() - started
+        self.completed += 1
+        self.mean_seconds += (elapsed - self.mean_seconds) / min(self.completed, 50)
+        return web.json_response(result.to_dict())
+
+    def release(self) -> None:
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {"workers": self.jobs, "capacity": self.capacity, "in_flight": self.in_flight,
+                "completed": self.completed, "rejected": self.rejected, "timed_out": self.timed_out,
+                "mean_seconds": round(self.mean_seconds, 3)}
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def flag(request: web.Request, name: str) -> bool:
+    return request.query.get(name, "").lower() in ("1", "true", "yes")
+
+
+async def handle_parse(request: web.Request) -> web.Response:
+    """
+    POST /parse with the PDF as the request body, or as the "file" field of a multipart form.
+    Query flags: incremental, streaming, typed, raw_text; timeout=SECONDS lowers the deadline.
+    """
+    if request.content_type.startswith("multipart/"):
+        data = None
+        async for part in await request.multipart():
+            if part.name == "file":
+                data = await part.read()
+                break
+    else:
+        data = await request.read()
+    if not data:
+        return web.json_response({"status": "FAILED", "reason": "No PDF in the request."}, status=400)
+    try:
+        timeout = float(request.query["timeout"]) if "timeout" in request.query else None
+    except ValueError:
+        return web.json_response({"status": "FAILED", "reason": "timeout must be a number of seconds."}, status=400)
+
+    service: ParseService = request.app["service"]
+    return await service.parse(data, timeout, flag(request, "raw_text"), incremental=flag(request, "incremental"),
+                               streaming=flag(request, "streaming"), typed=flag(request, "typed"))
+
+
+async def handle_health(request: web.Request) -> web.Response:
+    return web.json_response(request.app["service"].stats())
+
+
+def create_app(service: ParseService) -> web.Application:
+    app = web.Application(client_max_size=MAX_UPLOAD_MB * 1024 * 1024)
+    app["service"] = service
+    app.router.add_post("/parse", handle_parse)
+    app.router.add_get("/health", handle_health)
+
+    async def close_service(_app):
+        service.close()
+    app.on_cleanup.append(close_service)
+    return app
+
+
+def main(argv: List[str] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description="HTTP service that parses credit card statement PDFs.")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8080)
+    arg_parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    arg_parser.add_argument("--queue", type=int, default=DEFAULT_QUEUE_SIZE,
+                            help="Requests allowed to wait for a worker before new ones get 503")
+    arg_parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Per-request deadline in seconds")
+    arg_parser.add_argument("--memory-limit", type=float, metavar="MB",
+                            help="Fail a streamed document once its worker uses more than this much memory")
+    arg_parser.add_argument("--cache-db", help="SQLite result cache shared by all workers")
+    args = arg_parser.parse_args(argv)
+
+    service = ParseService(args.jobs, args.queue, args.timeout, os.environ.get("GEMINI_API_KEY"),
+                           args.cache_db, args.memory_limit)
+    pids = service.start()
+    print(f"Started {len(pids)} worker(s), serving on http://{args.host}:{args.port}", file=sys.stderr)
+    web.run_app(create_app(service), host=args.host, port=args.port, print=None)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
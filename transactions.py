@@ -0,0 +1,138 @@
+import re
+from typing import Dict, Iterator, List
+
+import numpy as np
+import pandas as pd
+import pdfplumber
+
+from pdf_input import PdfSource, open_pdf
+from regex_patterns import REGEX_TEMPLATES
+
+# Words whose tops differ by at most this many points are on the same line
+LINE_TOLERANCE = 3
+# Date format tried first when the bank's template declares no "transaction_date_format"
+DEFAULT_DATE_FORMAT = "%d/%m/%Y"
+
+DATE_TOKEN = r"\d{1,2}[/\-.]\d{1,2}[/\-.]\d{2,4}|\d{1,2}\s+[A-Za-z]{3}[a-z]*,?\s+\d{2,4}"
+ROW_RE = re.compile(rf"^({DATE_TOKEN})\s+(.+?)\s+(?:Rs\.?|INR|₹|`)?\s*([\d,]+\.\d{{2}})\s*(Cr|CR|cr|Dr|DR|dr)?$")
+# Everything clean_amount strips, for amounts that are not plain digits and commas: anything but
+# digits and dots, then every dot but the last
+NON_AMOUNT_RE = r"[^\d.]"
+EXTRA_DOTS_RE = r"\.(?=[^.]*\.)"
+
+COLUMNS = ["page", "date", "description", "amount", "direction", "signed_amount"]
+
+
+def iter_lines(page) -> Iterator[List[dict]]:
+    """Groups a pdfplumber page's words into lines by position, top to bottom and left to right."""
+    words = sorted(page.extract_words(), key=lambda w: (w["top"], w["x0"]))
+    line = []
+    for word in words:
+        if line and word["top"] - line[0]["top"] > LINE_TOLERANCE:
+            yield sorted(line, key=lambda w: w["x0"])
+            line = []
+        line.append(word)
+    if line:
+        yield sorted(line, key=lambda w: w["x0"])
+
+
+def extract_transaction_rows(pdf_file: PdfSource) -> Dict[str, list]:
+    """
+    Reads the transaction rows of every page as raw string columns: a row is a line that starts
+    with a date and ends with an amount and an optional Cr/Dr flag. A line with neither that starts
+    inside the description column of the row above is a wrapped description and is appended to it.
+    """
+    rows = {"page": [], "date": [], "description": [], "amount": [], "direction": []}
+    with open_pdf(pdf_file) as stream, pdfplumber.open(stream) as pdf:
+        for page_number, page in enumerate(pdf.pages, start=1):
+            description_x = None
+            for line in iter_lines(page):
+                text = " ".join(word["text"] for word in line)
+                match = ROW_RE.match(text)
+                if match:
+                    date, description, amount, direction = match.groups()
+                    rows["page"].append(page_number)
+                    rows["date"].append(date)
+                    rows["description"].append(description)
+                    rows["amount"].append(amount)
+                    rows["direction"].append(direction or "")
+                    # The description starts at the first word after the date's words
+                    description_x = line[len(date.split())]["x0"]
+                elif description_x is not None and abs(line[0]["x0"] - description_x) <= LINE_TOLERANCE:
+                    rows["description"][-1] += " " + text
+                else:
+                    description_x = None
+            # Drop the page's cached characters and layout objects before moving on
+            page.close()
+    return rows
+
+
+def normalize_transactions(rows: Dict[str, list], date_format: str = DEFAULT_DATE_FORMAT) -> pd.DataFrame:
+    """
+    Turns raw string columns into typed ones with whole-column operations: dates become datetime64
+    (NaT when unreadable), amounts float64 (NaN when unreadable), and the Cr/Dr flag a CR/DR
+    direction (DR when absent). signed_amount is negative for credits.
+    """
+    dates = pd.Series(rows["date"], dtype=object)
+    parsed = pd.to_datetime(dates, format=date_format, errors="coerce")
+    unparsed = parsed.isna()
+    if unparsed.any():
+        # Rows in another layout, e.g. "12 Mar 2023", get a slower per-value pass
+        parsed[unparsed] = pd.to_datetime(dates[unparsed], format="mixed", dayfirst=True, errors="coerce")
+
+    raw_amounts = pd.Series(rows["amount"], dtype=object)
+    amounts = pd.to_numeric(raw_amounts.str.replace(",", "", regex=False), errors="coerce")
+    unparsed = amounts.isna()
+    if unparsed.any():
+        cleaned = raw_amounts[unparsed].str.replace(NON_AMOUNT_RE, "", regex=True).str.replace(EXTRA_DOTS_RE, "", regex=True)
+        amounts[unparsed] = pd.to_numeric(cleaned, errors="coerce")
+    amounts = amounts.astype("float64")
+
+    is_credit = pd.Series(rows["direction"], dtype=object).str.upper().eq("CR").to_numpy()
+    return pd.DataFrame({
+        "page": np.asarray(rows["page"], dtype="int64"),
+        "date": parsed.astype("datetime64[ns]"),
+        "description": pd.Series(rows["description"], dtype="string"),
+        "amount": amounts,
+        "direction": pd.Series(np.where(is_credit, "CR", "DR"), dtype="string"),
+        "signed_amount": np.where(is_credit, -amounts, amounts),
+    }, columns=COLUMNS)
+
+
+def extract_transactions(pdf_file: PdfSource, bank_key: str = None) -> pd.DataFrame:
+    """
+    Extracts the statement's transaction table as a DataFrame with COLUMNS.
+    bank_key selects the template's "transaction_date_format"; without it DEFAULT_DATE_FORMAT is tried first.
+    """
+    date_format = REGEX_TEMPLATES.get(bank_key, {}).get("transaction_date_format", DEFAULT_DATE_FORMAT)
+    return normalize_transactions(extract_transaction_rows(pdf_file), date_format)
+
+
+def to_arrow(transactions: pd.DataFrame):
+    """The transactions as a pyarrow Table (requires pyarrow)."""
+    import pyarrow as pa
+    return pa.Table.from_pandas(transactions, preserve_index=False)
+
+
+def write_parquet(transactions: pd.DataFrame, path: str) -> None:
+    """Writes the transactions to a Parquet file (requires pyarrow)."""
+    transactions.to_parquet(path, index=False)
+
+
+class ParquetAppender:
+    """Writes transaction DataFrames with the same columns into one Parquet file as they arrive (requires pyarrow)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.writer = None
+
+    def write(self, transactions: pd.DataFrame) -> None:
+        table = to_arrow(transactions)
+        if self.writer is None:
+            import pyarrow.parquet as pq
+            self.writer = pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table.cast(self.writer.schema))
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
@@ -0,0 +1,135 @@
+import datetime
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import normalize
+
+NOT_FOUND = "NOT_FOUND"
+
+# Field scores: a value that cannot be right, one that is readable but suspect, and the factor
+# applied to both fields of a failed cross-field rule
+INVALID_SCORE = 0.0
+SUSPECT_SCORE = 0.5
+CONFLICT_FACTOR = 0.5
+
+# A payment falls due this many days after the statement date at most
+MAX_DUE_DAYS = 60
+# Dates outside these years are misreads (e.g. a transaction reference read as a date)
+MIN_YEAR = 2000
+MAX_YEARS_AHEAD = 1
+
+CARD_DIGITS_RE = re.compile(r'^\d{4}$')
+CARD_MASK_RE = re.compile(r'[\*Xx]{2}[\s\-]*$')
+# Candidates tried per field before the field is left as it is
+MAX_CANDIDATES = 10
+
+# Cross-field rules as (fields, check); when one fails, the fields are re-picked in the order listed
+Rule = Tuple[Tuple[str, str], Callable[[Dict[str, object]], bool]]
+
+
+def _amounts_consistent(values: Dict[str, object]) -> bool:
+    return values["min_payment"] <= values["total_due"]
+
+
+def _dates_consistent(values: Dict[str, object]) -> bool:
+    return 0 <= (values["payment_due_date"] - values["statement_date"]).days <= MAX_DUE_DAYS
+
+
+RULES: List[Rule] = [
+    (("min_payment", "total_due"), _amounts_consistent),
+    (("payment_due_date", "statement_date"), _dates_consistent),
+]
+
+
+@lru_cache(maxsize=4096)
+def _typed(key: str, value: str, bank_key: str) -> Optional[object]:
+    """
+    The value as a date or paise amount for the cross-field rules; None when it cannot be read.
+    Cached, since every check of a document reads the same few values.
+    """
+    if key in normalize.DATE_FIELDS:
+        iso = normalize.dates_to_iso([value], bank_key)[0]
+        return datetime.date.fromisoformat(iso) if iso else None
+    if key in normalize.AMOUNT_FIELDS:
+        return normalize.amounts_to_paise([value])[0]
+    return value
+
+
+def field_score(key: str, value: str, bank_key: str, text: str) -> float:
+    """How far a single value can be trusted on its own, from 0 to 1."""
+    if not value or value == NOT_FOUND:
+        return INVALID_SCORE
+    if key == "card_last_4_digits":
+        if not CARD_DIGITS_RE.match(value):
+            return INVALID_SCORE
+        # The real last four digits follow the masked part of the card number; other
+        # four-digit runs (phone numbers, PIN codes, years) do not
+        masked = any(CARD_MASK_RE.search(text, max(0, match.start() - 8), match.start())
+                     for match in re.finditer(value + r"(?!\d)", text))
+        return 1.0 if masked else SUSPECT_SCORE
+    typed = _typed(key, value, bank_key)
+    if typed is None:
+        return INVALID_SCORE
+    if key in normalize.DATE_FIELDS and not MIN_YEAR <= typed.year <= datetime.date.today().year + MAX_YEARS_AHEAD:
+        return INVALID_SCORE
+    return 1.0
+
+
+def score_fields(fields: Dict[str, str], bank_key: str, text: str,
+                 known: Dict[str, float] = None) -> Dict[str, float]:
+    """
+    Scores every field from 0 to 1: its own checks, halved for each cross-field rule it breaks.
+    known gives own-check scores taken earlier (e.g. against text no longer at hand); only the
+    other fields are checked against text.
+    """
+    known = known or {}
+    scores = {key: known[key] if key in known else field_score(key, value, bank_key, text)
+              for key, value in fields.items()}
+    for keys, check in RULES:
+        if all(scores.get(key, 0) > INVALID_SCORE for key in keys):
+            if not check({key: _typed(key, fields[key], bank_key) for key in keys}):
+                for key in keys:
+                    scores[key] *= CONFLICT_FACTOR
+    return {key: round(score, 2) for key, score in scores.items()}
+
+
+def validate_fields(fields: Dict[str, str], bank_key: str, text: str,
+                    candidates: Callable[[str], Iterable[str]]) -> Tuple[Dict[str, str], Dict[str, float]]:
+    """
+    Checks the picked fields and repairs them from the other regex matches. candidates(key) gives a
+    field's valid matches in pattern priority order. A value failing its own checks is replaced by the
+    first candidate that passes; when a cross-field rule fails, the first listed field that has a
+    candidate satisfying the rule takes it. A candidate equal to the other field's value is never taken:
+    it is usually the same number read through a looser label (e.g. "Amount Due" inside "Minimum Amount
+    Due"). Returns the fields and their scores (see score_fields).
+    """
+    fields = dict(fields)
+    tried = {}
+
+    def alternatives(key: str):
+        if key not in tried:
+            tried[key] = [value for _, value in zip(range(MAX_CANDIDATES), candidates(key))
+                          if value != fields[key] and field_score(key, value, bank_key, text) == 1.0]
+        return tried[key]
+
+    for key, value in fields.items():
+        if value != NOT_FOUND and field_score(key, value, bank_key, text) < 1.0:
+            fields[key] = next(iter(alternatives(key)), value)
+
+    for keys, check in RULES:
+        if any(fields.get(key, NOT_FOUND) == NOT_FOUND or field_score(key, fields[key], bank_key, text) == INVALID_SCORE
+               for key in keys):
+            continue
+        values = {key: _typed(key, fields[key], bank_key) for key in keys}
+        if check(values):
+            continue
+        for key in keys:
+            taken = {fields[other] for other in keys if other != key}
+            replacement = next((value for value in alternatives(key) if value not in taken
+                                and check(dict(values, **{key: _typed(key, value, bank_key)}))), None)
+            if replacement is not None:
+                fields[key] = replacement
+                break
+
+    return fields, score_fields(fields, bank_key, text)